@@ -19,14 +19,165 @@ AD5934 ad5934; //IC instance
 Adafruit_BME680 bme;
 
 
-float magnitudeData[3][NUM_INCREMENTS]; // 3 devices, NUM_INCREMENTS points per sweep 
-float phaseData[3][NUM_INCREMENTS];
+// AD5934 boards sit on mux channels 1..NUM_CHANNELS (channel 0 is the BME680), so at most 7.
+// Keep START_FREQUENCIES (and STEP_SIZE) in scoring.py in sync.
+#define NUM_CHANNELS 3
+const unsigned long startFrequencies[NUM_CHANNELS] = {START_FREQUENCY1, START_FREQUENCY2, START_FREQUENCY3};
+
+float magnitudeData[NUM_CHANNELS][NUM_INCREMENTS]; // NUM_INCREMENTS points per device and sweep
+float phaseData[NUM_CHANNELS][NUM_INCREMENTS];
+
+// Binary sweep frame (answer to "init_start_bin"/"start_bin"), layout and flow control documented in
+// sweep_frame.py on the Pi side
+#define FRAME_VERSION        1
+#define FRAME_KIND_PHASE_MAG 0   // float32 phase/magnitude blocks
+#define FRAME_CHUNK          256 // bytes per flow-control chunk
+#define FRAME_WINDOW         4   // chunks the host may have unacknowledged
+#define FRAME_ACK            0x06
+#define FRAME_ACK_TIMEOUT    1000
+
+uint32_t frameCrc;
+size_t frameSent;
+uint8_t frameCredits;
+bool frameAborted;
+String commandBacklog;  // command bytes the host sent while a frame was going out, see takeCredit
+
+// one credit per chunk; blocks until the host acks an earlier chunk, gives up after FRAME_ACK_TIMEOUT ms.
+// Anything else the host sends meanwhile is the next command: keep it for loop()
+bool takeCredit(){
+    unsigned long t0 = millis();
+    while (true){
+        while (Serial.available()){
+            int c = Serial.read();
+            if (c == FRAME_ACK){
+                frameCredits++;
+            } else {
+                commandBacklog += (char)c;
+            }
+        }
+        if (frameCredits > 0){
+            frameCredits--;
+            return true;
+        }
+        if (millis() - t0 > FRAME_ACK_TIMEOUT){
+            return false;
+        }
+    }
+}
+
+// writes in FRAME_CHUNK pieces as credits allow; bitwise CRC-32 (same polynomial as zlib.crc32) of what was written
+void frameWrite(const uint8_t* buf, size_t len){
+    while (len > 0 && !frameAborted){
+        size_t offset = frameSent % FRAME_CHUNK;
+        if (offset == 0 && !takeCredit()){
+            frameAborted = true;  // host gone; it times out and asks again
+            return;
+        }
+        size_t n = min(len, (size_t)(FRAME_CHUNK - offset));
+        Serial.write(buf, n);
+        for (size_t i = 0; i < n; i++){
+            frameCrc ^= buf[i];
+            for (int b = 0; b < 8; b++){
+                frameCrc = (frameCrc >> 1) ^ (0xEDB88320UL & (0UL - (frameCrc & 1UL)));
+            }
+        }
+        frameSent += n;
+        buf += n;
+        len -= n;
+    }
+}
+
+void sendSweepFrame(uint8_t channelMask, float temperature, float humidity){
+    uint16_t points = NUM_INCREMENTS;
+    uint8_t header[8] = {0xA5, 0x5A, FRAME_VERSION, FRAME_KIND_PHASE_MAG, NUM_CHANNELS, channelMask,
+                         (uint8_t)(points & 0xFF), (uint8_t)(points >> 8)};
+
+    frameCrc = 0xFFFFFFFFUL;
+    frameSent = 0;
+    frameCredits = FRAME_WINDOW;
+    frameAborted = false;
+    frameWrite(header, sizeof(header));
+    frameWrite((const uint8_t*)&temperature, 4);
+    frameWrite((const uint8_t*)&humidity, 4);
+    for (int channel = 0; channel < NUM_CHANNELS; channel++){
+        frameWrite((const uint8_t*)phaseData[channel], sizeof(phaseData[channel]));
+        frameWrite((const uint8_t*)magnitudeData[channel], sizeof(magnitudeData[channel]));
+    }
+    uint32_t crc = frameCrc ^ 0xFFFFFFFFUL;
+    frameWrite((const uint8_t*)&crc, 4);
+    Serial.flush();
+}
+
+
+// setupBME680 runs once; a failed reading forces it again on the next request
+bool bmeReady = false;
+
+bool readEnvironment(float &temperature, float &humidity){
+    multiplexer.selectChannel(0);
+    if (!bmeReady){
+        bmeReady = setupBME680(bme);
+    }
+    if (!bmeReady || !bme.performReading()){
+        bmeReady = false;
+        return false;
+    }
+    temperature = bme.temperature;
+    humidity = bme.humidity;
+    return true;
+}
+
+
+// Link rate: the board boots at BOOT_BAUD; "baud <rate>" switches after the reply and keeps the
+// new rate only if the host's "ping" arrives at it within BAUD_CONFIRM_TIMEOUT ms.
+#define BOOT_BAUD            115200
+#define BAUD_CONFIRM_TIMEOUT 2000
+#define COMMAND_TIMEOUT      1000  // only for hosts that do not end commands with '\n'
+
+long currentBaud = BOOT_BAUD;
+
+void switchBaud(long rate){
+    if (rate < 9600 || rate > 2000000){
+        Serial.println("baud error");
+        return;
+    }
+    Serial.print("baud ");
+    Serial.println(rate);
+    Serial.flush();
+    Serial.end();
+    Serial.begin(rate);
+
+    Serial.setTimeout(BAUD_CONFIRM_TIMEOUT);
+    String reply = Serial.readStringUntil('\n');
+    reply.trim();
+    Serial.setTimeout(COMMAND_TIMEOUT);
+    if (reply == "ping"){
+        currentBaud = rate;
+        Serial.println("pong");
+    } else {
+        Serial.end();
+        Serial.begin(currentBaud);
+    }
+}
+
+// "probe <n>": n filler bytes and a line end, so the host can time the link
+void sendProbe(long count){
+    uint8_t filler[64];
+    memset(filler, 'U', sizeof(filler));
+    while (count > 0){
+        size_t n = min(count, (long)sizeof(filler));
+        Serial.write(filler, n);
+        count -= n;
+    }
+    Serial.println();
+    Serial.flush();
+}
 
 
 void setup() {
     Wire.begin();
-    Serial.begin(115200);
-    delay(6000);  // Give time for Serial monitor to initialize. adjust per your needs
+    Serial.begin(BOOT_BAUD);
+    Serial.setTimeout(COMMAND_TIMEOUT);
+    while (!Serial && millis() < 6000) {}  // wait for the host to open the port (native USB boards), at most 6 s
     Serial.println("starting");
 
     if (!multiplexer.begin()){
@@ -37,11 +188,33 @@ void setup() {
 
 void loop() {
 
- String command = Serial.readString();
-
- if(command == "start" || command == "init_start"){
-
-    for (int channel = 1; channel <=3; channel++){
+ // commands end with '\n'; without one they end after COMMAND_TIMEOUT ms of silence
+ String command;
+ int newline = commandBacklog.indexOf('\n');
+ if (newline >= 0){
+    command = commandBacklog.substring(0, newline);
+    commandBacklog.remove(0, newline + 1);
+ } else {
+    command = commandBacklog + Serial.readStringUntil('\n');
+    commandBacklog = "";
+ }
+ command.trim();
+
+ if (command.startsWith("baud ")){
+    switchBaud(command.substring(5).toInt());
+    return;
+ }
+ if (command.startsWith("probe ")){
+    sendProbe(command.substring(6).toInt());
+    return;
+ }
+
+ bool binary = (command == "start_bin" || command == "init_start_bin");
+
+ if(command == "start" || command == "init_start" || binary){
+    uint8_t channelMask = 0;
+
+    for (int channel = 1; channel <= NUM_CHANNELS; channel++){
             //Serial.println("Switching to channel ");
             //Serial.println(channel);
 
@@ -56,19 +229,7 @@ void loop() {
                     continue; // Skip to next channel
                 }
 
-                unsigned long startFrequency;
-                switch (channel)
-                {
-                    case 1:
-                        startFrequency = START_FREQUENCY1;
-                        break;
-                    case 2:
-                        startFrequency = START_FREQUENCY2;
-                        break;
-                    case 3:
-                        startFrequency = START_FREQUENCY3;
-                        break;
-                }
+                unsigned long startFrequency = startFrequencies[channel - 1];
 
                 if (!ad5934.setupAD5934(startFrequency))
                 {
@@ -78,6 +239,7 @@ void loop() {
                 }
     
                 ad5934.setPGAGain(1); //setting the gain either 1 or 5, can be commented later
+                channelMask |= (1 << (channel - 1));
 
                 // Perform the sweep and process data
                 SweepAndProcess(channel, ad5934, multiplexer, magnitudeData, phaseData, channel - 1); //channel -1 bc channel starts from 1 but array starts from 0
@@ -102,7 +264,14 @@ void loop() {
 
         //const char* labels[2] = {"PHASE", "MAG"};
 
-            for(int channel = 1; channel <= 3; channel++){ //loops through 3 channels
+        if (binary){
+            float temperature = 0;
+            float humidity = 0;
+            readEnvironment(temperature, humidity);
+
+            sendSweepFrame(channelMask, temperature, humidity);
+        } else {
+            for(int channel = 1; channel <= NUM_CHANNELS; channel++){ //loops through the channels
                 //delay(10);
                 for (int type = 0; type < 2; type++) { //switches between 2 arrays- phase and magnitude
                     float* dataRow = (type == 0) ? phaseData[channel-1] : magnitudeData[channel-1];
@@ -129,11 +298,7 @@ void loop() {
             //if(command == "start"){
             float temperature = 0;
             float humidity = 0;
-            multiplexer.selectChannel(0);
-            setupBME680(bme);  
-            bme.performReading();
-            temperature = bme.temperature;
-            humidity = bme.humidity;
+            readEnvironment(temperature, humidity);
 
             //Serial.write(38); //should not be needed as after 3rd magnitude data sent it will go to next row again
             
@@ -143,16 +308,13 @@ void loop() {
 
             Serial.flush();
            // }
+        }
     }
 
     if (command == "temp"){
         float temperature = 0;
         float humidity = 0;
-        multiplexer.selectChannel(0);
-        setupBME680(bme);  
-        bme.performReading();
-        temperature = bme.temperature;
-        humidity = bme.humidity;
+        readEnvironment(temperature, humidity);
 
         //Serial.write(38); //should not be needed as after 3rd magnitude data sent it will go to next row again
             
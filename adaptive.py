@@ -0,0 +1,114 @@
+"""Adaptive measurement: repeat the normal sweep until the estimates settle.
+
+Each sweep's per-channel phase peak index and magnitude span feed running
+(Welford) mean/variance estimates. The measurement stops once the
+confidence interval of every estimate is within the tolerance, or after
+``max_sweeps``. Good contacts finish after a few sweeps; noisy ones get more
+samples instead of a single, possibly wrong, reading.
+
+Every sweep costs the full board sweep, at least 30 s for three channels
+(see SWEEP_TIMEOUT_S in final_code_thesis.py), and the probe has to be held
+throughout. So this trades hold time for confidence: two sweeps, the least
+that gives a variance, already take longer than the single-sweep countdown.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from features import FeatureEngine
+
+
+class RunningStats:
+    """Welford's streaming mean/variance, element-wise over arrays of any shape."""
+
+    def __init__(self, shape=()):
+        self.n = 0
+        self.mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+
+    def update(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self):
+        if self.n < 2:
+            return np.full_like(self.mean, np.inf)
+        return self._m2 / (self.n - 1)
+
+    def half_width(self, z=1.96):
+        """Half width of the confidence interval of the mean."""
+        return z * np.sqrt(self.variance / max(self.n, 1))
+
+
+class ConvergencePolicy(NamedTuple):
+    tolerance: float = 1.0   # bins; CI half width required for every estimate
+    min_sweeps: int = 2      # the least that gives a variance
+    max_sweeps: int = 10
+    z: float = 1.96          # 95 %
+
+
+class AdaptiveResult(NamedTuple):
+    phase_shift: np.ndarray  # mean phase peak shift per channel, in bins
+    confidence: float        # largest CI half width of the peak estimates, in bins
+    mag_span_diff: np.ndarray
+    sweeps: int
+    converged: bool
+    mean_sweep: np.ndarray   # average of the normal sweeps, for saving
+
+    @property
+    def quality(self):
+        """Mean phase peak shifts as the tuple shown on the results screen."""
+        return tuple(int(round(v)) for v in self.phase_shift)
+
+
+class AdaptiveMeasurement:
+    def __init__(self, init, engine=None, policy=ConvergencePolicy()):
+        self.init = np.asarray(init)
+        self.engine = engine or FeatureEngine()
+        self.policy = policy
+        channels = self.init.shape[0] // 2
+        self.peaks = RunningStats(channels)
+        self.spans = RunningStats(channels)
+        self.sweep_mean = RunningStats(self.init.shape)
+        self._last = None
+
+    @property
+    def sweeps(self):
+        return self.peaks.n
+
+    def add(self, normal):
+        features = self.engine.extract_pair(self.init, normal)
+        self._last = features
+        self.peaks.update(features.normal_peaks)
+        self.spans.update(features.normal_mag_span)
+        self.sweep_mean.update(normal)
+        return features
+
+    @property
+    def converged(self):
+        if self.sweeps < self.policy.min_sweeps:
+            return False
+        z, tol = self.policy.z, self.policy.tolerance
+        return bool((self.peaks.half_width(z) <= tol).all() and (self.spans.half_width(z) <= tol).all())
+
+    @property
+    def done(self):
+        return self.converged or self.sweeps >= self.policy.max_sweeps
+
+    def result(self) -> AdaptiveResult:
+        if self._last is None:
+            raise ValueError("no sweeps added")
+        init = self._last  # init features are the same for every sweep
+        return AdaptiveResult(
+            np.abs(init.init_peaks - self.peaks.mean),
+            float(self.peaks.half_width(self.policy.z).max()),
+            np.abs(init.init_mag_span - self.spans.mean),
+            self.sweeps,
+            self.converged,
+            self.sweep_mean.mean,
+        )
@@ -0,0 +1,67 @@
+"""Signal processing shared by the GUI and the headless tools.
+
+Importing this module touches no hardware, so it can be reused on any
+machine with numpy and scipy.
+"""
+
+import numpy as np
+
+from features import FeatureEngine, SweepFeatures, savgol_batch
+from sanitize import sanitize_row
+
+# Savitzky-Golay filter setup
+WINDOW_LENGTH = 31
+POLYORDER = 3
+
+
+def remove_nan_ovf(array):
+    """Decode one sweep row, interpolating over ovf/nan points."""
+    return sanitize_row(array)[0]
+
+
+def filter_and_find_peaks(data, window_length=WINDOW_LENGTH, polyorder=POLYORDER):
+    filtered_data = savgol_batch(data, window_length, polyorder)
+    peak_index = np.argmax(filtered_data)
+    min_index = np.argmin(filtered_data)
+    return abs(peak_index - min_index)
+
+
+def compute_quality(init, normal, window_length=WINDOW_LENGTH, polyorder=POLYORDER) -> SweepFeatures:
+    """Features of one measurement; ``.quality`` is what the results screen shows."""
+    return FeatureEngine(window_length, polyorder).extract_pair(init, normal)
+
+
+def parse_temperature_line(line: str):
+    """
+    Accepts either '25.4' or '25.4&40.2'.
+    Returns (temp_float, hum_float or None).
+    """
+    try:
+        parts = [p.strip() for p in line.split("&")]
+        if len(parts) == 1:
+            t = float(parts[0]) if parts[0] else 0.0
+            return t, None
+        elif len(parts) >= 2:
+            t = float(parts[0]) if parts[0] else 0.0
+            h = float(parts[1]) if parts[1] else None
+            return t, h
+    except Exception:
+        pass
+    return 0.0, None
+
+
+def read_environment(line: str):
+    """(temperature, humidity or None) of a 'temp&hum' line, or None without a reading.
+
+    The firmware prints 0.00&0.00 when the BME680 read fails; that, or an
+    unparseable line, is no reading rather than 0 °C.
+    """
+    temperature, humidity = parse_temperature_line(line)
+    if temperature == 0.0 and not humidity:
+        return None
+    return temperature, humidity
+
+
+def load_sweep_csv(path):
+    """Read a sweep saved by the GUI (one column per row) back as (rows, points)."""
+    return np.loadtxt(path, delimiter=",", ndmin=2).T
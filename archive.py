@@ -0,0 +1,163 @@
+"""Append-only measurement archive.
+
+Every measurement is one fixed-size record (timestamp, temperature,
+humidity, the score shown to the operator, the per-channel phase peak
+shifts and both raw sweeps as float32) appended to the current session's
+``.rec`` file. The record layout is stored next to it in a
+``.json`` file, so a session can be memory-mapped back without parsing
+text. Writes go through a background thread and never block the Tk loop.
+A failed write is counted and appended as a JSON line to ``errors.jsonl``
+in the archive directory, when that is writable.
+"""
+
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from timing import span
+
+ARCHIVE_VERSION = 2  # 1: "quality" held the phase shifts, no score
+
+
+def record_dtype(rows, points):
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("temperature", "<f4"),
+        ("humidity", "<f4"),
+        ("score", "<f4"),
+        ("phase_shift", "<f4", (rows // 2,)),
+        ("init", "<f4", (rows, points)),
+        ("normal", "<f4", (rows, points)),
+    ])
+
+
+class ArchiveWriter(threading.Thread):
+    """Runs submitted jobs one after another on a daemon thread."""
+
+    def __init__(self, error_log=None):
+        super().__init__(name="archive-writer", daemon=True)
+        self.jobs = queue.Queue()
+        self.error_log = error_log
+        self.failures = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.jobs.put((fn, args, kwargs))
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            fn, args, kwargs = job
+            try:
+                with span(f"save_{fn.__name__.lstrip('_')}"):
+                    fn(*args, **kwargs)
+            except Exception as exc:  # a failed write must not kill the writer
+                self.failures += 1
+                self._log_failure(fn, exc)
+
+    def _log_failure(self, fn, exc):
+        if not self.error_log:
+            return
+        entry = {"time": time.time(), "job": fn.__name__, "error": f"{type(exc).__name__}: {exc}"}
+        try:
+            with open(self.error_log, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass  # still counted in failures
+
+    def close(self, timeout=5.0):
+        self.jobs.put(None)
+        self.join(timeout)
+
+
+class MeasurementArchive:
+    def __init__(self, directory, rows=6, points=501):
+        self.directory = directory
+        self.dtype = record_dtype(rows, points)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(directory, f"session-{stamp}.rec")
+        self._meta_written = False
+        self.writer = ArchiveWriter(os.path.join(directory, "errors.jsonl"))
+        self.writer.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """Run any other slow write (e.g. the legacy CSV export) on the writer thread."""
+        self.writer.submit(fn, *args, **kwargs)
+
+    def append(self, init, normal, temperature, humidity, score, phase_shift, timestamp=None):
+        record = np.zeros(1, dtype=self.dtype)
+        record["timestamp"] = time.time() if timestamp is None else timestamp
+        record["temperature"] = temperature
+        record["humidity"] = humidity if humidity is not None else np.nan
+        record["score"] = score
+        record["phase_shift"] = phase_shift
+        record["init"] = init
+        record["normal"] = normal
+        self.writer.submit(self._write, record)
+
+    def _write(self, record):
+        if not self._meta_written:
+            os.makedirs(self.directory, exist_ok=True)
+            meta = {"version": ARCHIVE_VERSION, "descr": np.lib.format.dtype_to_descr(self.dtype)}
+            with open(self.path[:-len(".rec")] + ".json", "w") as f:
+                json.dump(meta, f)
+            self._meta_written = True
+        with open(self.path, "ab") as f:
+            f.write(record.tobytes())
+
+    @property
+    def failures(self):
+        """Writes that failed since the archive was opened."""
+        return self.writer.failures
+
+    def close(self):
+        self.writer.close()
+
+
+# -------------------- Reading --------------------
+
+def list_sessions(directory):
+    return sorted(glob.glob(os.path.join(directory, "session-*.rec")))
+
+
+def open_session(path):
+    """Memory-map a session's records (read-only). A torn last record is ignored.
+
+    Older sessions open with their own layout (the .json keeps it), so
+    version 1 records have "quality" instead of "score" and "phase_shift".
+    """
+    with open(path[:-len(".rec")] + ".json") as f:
+        meta = json.load(f)
+    if meta["version"] > ARCHIVE_VERSION:
+        raise ValueError(f"{path}: unsupported archive version {meta['version']}")
+    dtype = np.lib.format.descr_to_dtype([tuple(d) for d in meta["descr"]])
+    count = os.path.getsize(path) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+
+def load_range(directory, start=None, end=None):
+    """Records with ``start <= timestamp < end`` across all sessions, oldest first.
+
+    Returns None when no record falls in the range.
+    """
+    chunks = []
+    for path in list_sessions(directory):
+        records = open_session(path)
+        if not len(records):
+            continue
+        ts = records["timestamp"]  # append-only, hence sorted
+        lo = 0 if start is None else np.searchsorted(ts, start, side="left")
+        hi = len(ts) if end is None else np.searchsorted(ts, end, side="left")
+        if hi > lo:
+            chunks.append(np.array(records[lo:hi]))
+    if not chunks:
+        return None
+    return np.concatenate(chunks)
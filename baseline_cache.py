@@ -0,0 +1,94 @@
+"""Cache of the initial (baseline) sweep, in memory and on disk.
+
+A "New Measurement" normally starts with an ``init_start`` sweep. When the
+last baseline is recent enough and the temperature has not drifted, it is
+reused and the operator goes straight to the examination screen.
+"""
+
+import os
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class BaselineEntry(NamedTuple):
+    data: np.ndarray             # (rows, points) init sweep
+    timestamp: float             # time.time() of the sweep
+    temperature: float           # BME680 reading sent with the sweep
+    humidity: float
+    start_frequencies: tuple     # per channel, Hz
+
+
+class StalenessPolicy(NamedTuple):
+    max_age_s: float = 30 * 60
+    max_temp_drift: float = 1.0  # °C
+
+    def is_fresh(self, entry: BaselineEntry, now: float, temperature: Optional[float]) -> bool:
+        if now - entry.timestamp > self.max_age_s:
+            return False
+        if temperature is None:
+            return False
+        return abs(temperature - entry.temperature) <= self.max_temp_drift
+
+
+class BaselineCache:
+    def __init__(self, path, start_frequencies, policy=StalenessPolicy()):
+        self.path = path
+        self.start_frequencies = tuple(start_frequencies)
+        self.policy = policy
+        self._entry = None
+        self._loaded = False
+
+    def _load(self):
+        self._loaded = True
+        try:
+            with np.load(self.path) as f:
+                self._entry = BaselineEntry(
+                    f["data"], float(f["timestamp"]), float(f["temperature"]),
+                    float(f["humidity"]), tuple(int(v) for v in f["start_frequencies"]),
+                )
+        except (OSError, KeyError, ValueError):
+            self._entry = None
+
+    def peek(self, now=None) -> Optional[BaselineEntry]:
+        """Cached entry for the current frequencies if not too old, ignoring temperature."""
+        if not self._loaded:
+            self._load()
+        entry = self._entry
+        if entry is None or entry.start_frequencies != self.start_frequencies:
+            return None
+        now = time.time() if now is None else now
+        if now - entry.timestamp > self.policy.max_age_s:
+            return None
+        return entry
+
+    def get(self, temperature, now=None) -> Optional[BaselineEntry]:
+        """Cached entry if the staleness policy allows reusing it at ``temperature``."""
+        entry = self.peek(now)
+        now = time.time() if now is None else now
+        if entry is None or not self.policy.is_fresh(entry, now, temperature):
+            return None
+        return entry
+
+    def store(self, data, temperature, humidity, timestamp=None):
+        entry = BaselineEntry(
+            np.array(data), time.time() if timestamp is None else timestamp,
+            float(temperature), float(humidity or 0.0), self.start_frequencies,
+        )
+        self._entry = entry
+        self._loaded = True
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, data=entry.data, timestamp=entry.timestamp,
+                     temperature=entry.temperature, humidity=entry.humidity,
+                     start_frequencies=np.array(entry.start_frequencies))
+        os.replace(tmp, self.path)  # never leave a half-written baseline behind
+
+    def invalidate(self):
+        self._entry = None
+        self._loaded = True
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,185 @@
+"""Latency benchmarks for the measurement pipeline, runnable on any Linux box.
+
+Stages: serial parse, sanitize, filter/peak extraction, save, and the full
+"OK pressed -> results ready" path against the pty emulator, for ASCII rows
+and for the flow-controlled binary frame (the Tk redraw itself is not
+included). Results can be saved as JSON and compared with a previous run so
+regressions fail the command.
+
+    python -m benchmarks.bench_pipeline --json bench.json
+    python -m benchmarks.bench_pipeline --compare bench.json --tolerance 1.3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import serial
+from scipy.signal import savgol_filter  # type: ignore
+
+from archive import MeasurementArchive
+from emulator import DeviceEmulator
+from features import FeatureEngine
+from sanitize import sanitize_row
+from sweep_reader import SweepParser, SweepReader
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def wire_bytes(emulator, shifted):
+    lines = [",".join(tokens) + ",\r\n" for tokens in emulator.ascii_rows(emulator.sweep(shifted))]
+    return "".join(lines).encode() + b"21.50&45.00\r\n"
+
+
+def bench_parse(emulator, repeat):
+    payload = wire_bytes(emulator, shifted=True)
+
+    def run():
+        parser = SweepParser()
+        for i in range(0, len(payload), 64):  # USB-serial sized chunks
+            parser.feed(payload[i:i + 64])
+    return timed(run, repeat)
+
+
+def bench_sanitize(emulator, repeat):
+    rows = [",".join(tokens) + "," for tokens in emulator.ascii_rows(emulator.sweep(True))]
+    return timed(lambda: [sanitize_row(row, 501) for row in rows], repeat)
+
+
+def bench_features(emulator, repeat):
+    init, normal = emulator.sweep(False), emulator.sweep(True)
+    engine = FeatureEngine()
+    engine.extract_pair(init, normal)  # warm the savgol_kernel cache
+    return timed(lambda: engine.extract_pair(init, normal), repeat)
+
+
+def bench_features_legacy(emulator, repeat):
+    init, normal = emulator.sweep(False), emulator.sweep(True)
+
+    def run():
+        for sweep in (init, normal):
+            for row in sweep:
+                np.argmax(savgol_filter(row, 31, 3))
+    return timed(run, repeat)
+
+
+def bench_save(emulator, repeat, directory):
+    """(cost to the UI thread of archive.append, cost of the write on the writer thread)"""
+    init, normal = emulator.sweep(False), emulator.sweep(True)
+    archive = MeasurementArchive(directory)
+    enqueue = timed(lambda: archive.append(init, normal, 21.5, 45.0, 6.0, (6, 6, 6)), repeat)
+    archive.close()
+    record = np.zeros(1, dtype=archive.dtype)
+    record["init"], record["normal"] = init, normal
+    write = timed(lambda: archive._write(record), repeat)
+    return enqueue, write
+
+
+def bench_savetxt(emulator, repeat, directory):
+    data = emulator.sweep(True)
+    path = os.path.join(directory, "normal_phaseAndMagnitudeData.csv")
+    return timed(lambda: np.savetxt(path, data.T, delimiter=","), repeat)
+
+
+def bench_end_to_end(repeat, pacing, directory, command=b"start"):
+    emulator = DeviceEmulator(seed=0, pacing=pacing, banner=False)
+    emulator.start()
+    ser = serial.Serial(emulator.port, 115200, timeout=0.05)
+    reader = SweepReader(ser)
+    reader.start()
+    engine = FeatureEngine()
+    archive = MeasurementArchive(directory)
+    try:
+        ser.write(b"init_start\n")
+        init = _wait_sweep(reader).data
+
+        def run():
+            reader.discard_pending()
+            ser.write(command + b"\n")
+            normal = _wait_sweep(reader).data
+            features = engine.extract_pair(init, normal)
+            archive.append(init, normal, 21.5, 45.0, float(features.phase_shift.mean()), features.phase_shift)
+        return timed(run, repeat)
+    finally:
+        reader.stop()
+        archive.close()
+        ser.close()
+        emulator.stop()
+
+
+def _wait_sweep(reader, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        sweep = reader.take("sweep")
+        if sweep is not None:
+            return sweep
+        time.sleep(0.001)
+    raise TimeoutError("no sweep from emulator")
+
+
+def summarize(samples):
+    ms = sorted(s * 1e3 for s in samples)
+    return {"median_ms": statistics.median(ms), "p95_ms": ms[int(0.95 * (len(ms) - 1))], "n": len(ms)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--repeat", type=int, default=30)
+    parser.add_argument("--pacing", type=float, default=0.0,
+                        help="emulator seconds per value for the end-to-end run (board: 0.01)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="fail if a stage is slower than in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=1.3)
+    args = parser.parse_args(argv)
+
+    emulator = DeviceEmulator(seed=0, invalid_rate=0.005, banner=False)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        stages = [
+            ("serial_parse", lambda: bench_parse(emulator, args.repeat)),
+            ("sanitize", lambda: bench_sanitize(emulator, args.repeat)),
+            ("features", lambda: bench_features(emulator, args.repeat)),
+            ("features_legacy", lambda: bench_features_legacy(emulator, args.repeat)),
+            ("save_csv", lambda: bench_savetxt(emulator, args.repeat, tmp)),
+            ("end_to_end", lambda: bench_end_to_end(
+                max(1, args.repeat // 10 if args.pacing else args.repeat), args.pacing, tmp)),
+            ("end_to_end_bin", lambda: bench_end_to_end(args.repeat, 0.0, tmp, b"start_bin")),
+        ]
+        enqueue, write = bench_save(emulator, args.repeat, tmp)
+        stages[4:4] = [("save_enqueue", lambda: enqueue), ("save_write", lambda: write)]
+        for name, run in stages:
+            results[name] = summarize(run())
+            r = results[name]
+            print(f"{name:16s} median {r['median_ms']:9.2f} ms   p95 {r['p95_ms']:9.2f} ms")
+    emulator.stop()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        slower = [name for name, r in results.items()
+                  if name in baseline and r["median_ms"] > baseline[name]["median_ms"] * args.tolerance]
+        for name in slower:
+            print(f"REGRESSION {name}: {results[name]['median_ms']:.2f} ms "
+                  f"vs {baseline[name]['median_ms']:.2f} ms", file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
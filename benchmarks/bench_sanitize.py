@@ -0,0 +1,67 @@
+"""Micro-benchmark: decoding a 6x501 sweep, old string path vs sanitize.py.
+
+Run from the repository root:  python -m benchmarks.bench_sanitize
+"""
+
+import time
+
+import numpy as np
+
+from sanitize import sanitize_row
+
+ROWS, POINTS = 6, 501
+
+
+def legacy_remove_nan_ovf(array):
+    # the original per-character loop from final_code_thesis.py
+    i = 0
+    while i < len(array):
+        if array[i] == "ovf" or array[i] == "nan":
+            array[i] = 0
+        else:
+            i += 1
+    return array
+
+
+def legacy_decode(lines):
+    return [np.fromstring(legacy_remove_nan_ovf(line), dtype=float, sep=",") for line in lines]
+
+
+def vectorized_decode(lines):
+    return [sanitize_row(line, POINTS)[0] for line in lines]
+
+
+def make_rows(bad_points=0, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(ROWS):
+        tokens = [f"{v:.2f}" for v in rng.normal(100.0, 5.0, POINTS)]
+        for i in rng.choice(POINTS, bad_points, replace=False):
+            tokens[i] = "ovf"
+        rows.append(",".join(tokens) + ",")
+    return rows
+
+
+def best_of(fn, arg, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    # the legacy path cannot cope with ovf tokens, so compare on clean rows
+    clean = make_rows()
+    legacy = best_of(legacy_decode, clean)
+    vectorized = best_of(vectorized_decode, clean)
+    print(f"legacy      {legacy * 1e3:8.2f} ms per 6x{POINTS} sweep")
+    print(f"vectorized  {vectorized * 1e3:8.2f} ms per 6x{POINTS} sweep  ({legacy / vectorized:.1f}x)")
+
+    dirty = make_rows(bad_points=10)
+    print(f"vectorized  {best_of(vectorized_decode, dirty) * 1e3:8.2f} ms with 10 ovf points per row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Shift estimators compared: argmax, parabolic peak (scoring "peak") and FFT xcorr.
+
+Speed is timed for one measurement and for a batch of 100; stability is the
+spread of the estimated shift over repeated emulator sweeps with a known
+peak shift, and optionally over the records of an archive session.
+
+    python -m benchmarks.bench_shift
+    python -m benchmarks.bench_shift --session data/session-20240101-120000.rec
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from archive import open_session
+from emulator import DeviceEmulator
+from features import FeatureEngine, parabolic_peak
+from shift import xcorr_shift
+
+
+def argmax_shift(filtered):
+    peaks = np.argmax(filtered[..., 0::2, :], axis=-1).astype(np.float64)
+    return peaks[..., 1, :] - peaks[..., 0, :]
+
+
+def peak_shift(filtered):
+    peaks = parabolic_peak(filtered[..., 0::2, :])
+    return peaks[..., 1, :] - peaks[..., 0, :]
+
+
+def xcorr(filtered):
+    return xcorr_shift(filtered[..., 0, 0::2, :], filtered[..., 1, 0::2, :]).shift
+
+
+METHODS = (("argmax", argmax_shift), ("peak", peak_shift), ("xcorr", xcorr))
+
+
+def best_of(fn, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def report(title, filtered, repeat, expected=None):
+    """Timing and per-channel mean/std of every method on a (measurements, 2, rows, points) stack."""
+    print(f"{title}: {filtered.shape[0]} measurements")
+    for name, fn in METHODS:
+        single = best_of(fn, filtered[0], repeat)
+        batch = best_of(fn, filtered, max(1, repeat // 10))
+        shifts = fn(filtered)
+        mean = " ".join(f"{m:7.2f}" for m in shifts.mean(axis=0))
+        std = " ".join(f"{s:6.3f}" for s in shifts.std(axis=0))
+        bias = "" if expected is None else f"   bias {np.abs(shifts.mean(axis=0) - expected).max():5.2f}"
+        print(f"  {name:7s} {single * 1e3:7.3f} ms/one {batch * 1e3:8.2f} ms/batch   "
+              f"mean [{mean}]  std [{std}]{bias}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100, help="emulated measurements")
+    parser.add_argument("--noise", type=float, default=0.2)
+    parser.add_argument("--peak-shift", type=float, default=6.3, help="true shift in Hz (1 Hz steps)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--session", help="archive .rec file to measure stability on recorded data")
+    args = parser.parse_args(argv)
+
+    engine = FeatureEngine()
+    emulator = DeviceEmulator(noise=args.noise, peak_shift=args.peak_shift, banner=False, seed=0)
+    stack = np.stack([np.stack([emulator.sweep(False), emulator.sweep(True)]) for _ in range(args.count)])
+    emulator.stop()
+    report(f"emulator, true shift {args.peak_shift} Hz", engine.filter(stack), args.repeat, args.peak_shift)
+
+    if args.session:
+        records = open_session(args.session)
+        if not len(records):
+            print(f"{args.session}: no records")
+            return 1
+        stack = np.stack([records["init"], records["normal"]], axis=-3)
+        report(args.session, engine.filter(stack), args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
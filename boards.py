@@ -0,0 +1,76 @@
+"""Several serial-attached boards measured at once.
+
+Each board gets its own SweepReader thread and SerialSession, so the
+boards sweep and transfer in parallel and a measurement takes as long as
+the slowest board, not the sum. The finished sweeps are joined along the
+channel axis (sweep_model.concat) and scored in one batched call.
+
+    group = BoardGroup([Board("a", ser_a, (16900, 17235, 17330)),
+                        Board("b", ser_b, (16900, 17235, 17330))])
+    group.start()
+    init = group.measure(b"init_start_bin")
+    normal = group.measure(b"start_bin")
+    score = ScoringEngine(init.start_frequencies).score_pair(init.rows, normal.rows)
+"""
+
+from concurrent.futures import wait
+
+from serial_session import SerialSession, SessionError
+from sweep_model import Sweep, concat
+from sweep_reader import SWEEP_POINTS, SweepReader
+
+
+class Board:
+    def __init__(self, name, ser, start_frequencies, step=1.0, points=SWEEP_POINTS):
+        self.name = name
+        self.ser = ser
+        self.start_frequencies = tuple(start_frequencies)
+        self.step = step
+        self.reader = SweepReader(ser, rows=2 * len(self.start_frequencies), points=points)
+        self.session = SerialSession(ser, self.reader)
+
+
+class BoardGroup:
+    def __init__(self, boards):
+        self.boards = list(boards)
+        self._futures = {}
+
+    @property
+    def channels(self):
+        return sum(len(b.start_frequencies) for b in self.boards)
+
+    def start(self):
+        for board in self.boards:
+            board.reader.start()
+            board.session.start()
+
+    def request(self, command: bytes, timeout=75.0, idle_timeout=5.0):
+        """Send sweep ``command`` to every board through its session; poll() then collects the answers."""
+        self._futures = {board.name: board.session.sweep(command, timeout, idle_timeout)
+                         for board in self.boards}
+
+    def poll(self):
+        """The combined Sweep once every board has answered, else None. Does not block.
+
+        Raises SessionError naming the boards that failed.
+        """
+        if not all(future.done() for future in self._futures.values()):
+            return None
+        failed = [name for name, future in self._futures.items() if future.exception() is not None]
+        if failed:
+            raise SessionError(f"no sweep from {', '.join(failed)}")
+        return concat(Sweep.from_result(self._futures[board.name].result(), board.start_frequencies,
+                                        board.step, device=board.name)
+                      for board in self.boards)
+
+    def measure(self, command: bytes, timeout=75.0):
+        """request() and wait for the combined sweep, for use off the Tk thread."""
+        self.request(command, timeout)
+        wait(self._futures.values())
+        return self.poll()
+
+    def close(self):
+        for board in self.boards:
+            board.session.close()
+            board.reader.stop()
+            board.ser.close()
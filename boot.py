@@ -0,0 +1,147 @@
+"""Boot sequence: find the Arduino, open it, wait until it answers and agree on a link rate.
+
+Runs on a background thread so the splash screen keeps rendering. Each
+phase is timed; the timings are kept on the result and can be appended to
+a JSON lines log to track time-to-ready across units.
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import serial
+from serial.tools import list_ports
+
+from link import measure_throughput, negotiate_rate
+from sweep_reader import SWEEP_ROWS, SweepReader
+
+# USB vendor ids of Arduino boards and the usual USB-serial bridges on clones
+ARDUINO_VIDS = {0x2341, 0x2A03, 0x1B4F, 0x239A, 0x1A86, 0x0403, 0x10C4}
+
+
+class BootError(Exception):
+    pass
+
+
+class BootResult(NamedTuple):
+    port: Optional[str]
+    ser: Optional[serial.Serial]
+    reader: Optional[SweepReader]
+    phases: dict                 # phase name -> seconds
+    error: Optional[str]
+    rate: Optional[int] = None   # negotiated baud
+    throughput: Optional[float] = None  # bytes/s measured by the link probe
+
+
+def find_serial_port(default=None):
+    """Device path of the first Arduino-like serial port, else ``default``."""
+    ports = sorted(list_ports.comports(), key=lambda p: p.device)
+    for p in ports:
+        if p.vid in ARDUINO_VIDS:
+            return p.device
+    for p in ports:
+        if "ttyACM" in p.device or "ttyUSB" in p.device:
+            return p.device
+    return default
+
+
+class BootSequencer(threading.Thread):
+    """Detect -> open -> wait for the "starting" banner or a reply to a ``temp`` probe -> negotiate.
+
+    ``port`` skips detection (e.g. an emulator pty); ``default_port`` is only
+    used when detection finds nothing. ``rates`` are offered to the board
+    once it is ready (see link.py); empty keeps ``rate``. ``opener(port, rate,
+    timeout=...)`` opens the port, e.g. capture.open_serial to record or replay it.
+    """
+
+    def __init__(self, rate, port=None, default_port=None, ready_timeout=15.0, probe_interval=2.0,
+                 rows=SWEEP_ROWS, rates=(), opener=serial.Serial):
+        super().__init__(name="boot", daemon=True)
+        self.rate = rate
+        self.rates = rates
+        self.opener = opener
+        self.rows = rows  # 2 x channels of the board
+        self.port = port
+        self.default_port = default_port
+        self.ready_timeout = ready_timeout
+        self.probe_interval = probe_interval
+        self.result = None
+
+    def run(self):
+        phases = {}
+        start = mark = time.monotonic()
+
+        def lap(name):
+            nonlocal mark
+            now = time.monotonic()
+            phases[name] = now - mark
+            mark = now
+
+        port = ser = reader = None
+        try:
+            port = self.port or find_serial_port(self.default_port)
+            if port is None:
+                raise BootError("no serial device found")
+            lap("detect")
+
+            ser = self.opener(port, self.rate, timeout=1)
+            ser.reset_input_buffer()
+            reader = SweepReader(ser, rows=self.rows)
+            reader.start()
+            lap("open")
+
+            self._wait_ready(ser, reader)
+            lap("ready")
+
+            rate, throughput = ser.baudrate, None
+            if self.rates:
+                rate = negotiate_rate(ser, reader, self.rates)
+                lap("negotiate")
+                throughput = measure_throughput(ser, reader)
+                lap("probe")
+        except (BootError, serial.SerialException) as exc:
+            if reader is not None:
+                reader.stop()
+            if ser is not None:
+                ser.close()
+            phases["total"] = time.monotonic() - start
+            self.result = BootResult(port, None, None, phases, str(exc))
+            return
+        phases["total"] = mark - start
+        self.result = BootResult(port, ser, reader, phases, None, rate, throughput)
+
+    def _wait_ready(self, ser, reader):
+        now = time.monotonic()
+        deadline = now + self.ready_timeout
+        # give a freshly reset board a moment to print its banner before probing
+        next_probe = now + self.probe_interval
+        while now < deadline:
+            try:
+                kind, payload = reader.events.get(timeout=0.1)
+            except queue.Empty:
+                kind, payload = None, None
+            if kind == "text" and payload.startswith("starting"):
+                return
+            if kind == "text" and "failed" in payload:
+                raise BootError(payload)
+            if kind == "env":
+                return  # answered a temp probe, so it was already running
+            now = time.monotonic()
+            if now >= next_probe:
+                ser.write(b"temp\n")
+                next_probe = now + self.probe_interval
+        raise BootError("device did not answer")
+
+
+def log_boot(result: BootResult, path):
+    """Append the phase timings of one boot as a JSON line."""
+    entry = {"time": time.time(), "port": result.port, "error": result.error,
+             "phases": {k: round(v, 3) for k, v in result.phases.items()},
+             "rate": result.rate, "bytes_per_s": result.throughput and round(result.throughput)}
+    try:
+        with open(path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass
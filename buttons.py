@@ -0,0 +1,90 @@
+"""Front panel button input.
+
+A backend turns button presses into debounced names ("ok", "down", "left",
+"right") on a thread-safe queue. The Tk loop drains the queue and dispatches
+to its handlers. LgpioBackend uses lgpio edge alerts, so nothing is polled
+while the buttons are idle. SimulatedBackend accepts presses from code (tests,
+keyboard), so navigation also works on a machine without a GPIO chip.
+"""
+
+import queue
+import time
+
+try:
+    import lgpio
+except ImportError:  # not on the Pi
+    lgpio = None
+
+
+class InputBackend:
+    def __init__(self, pin_names, debounce_ms):
+        self.pin_names = dict(pin_names)
+        self.debounce_ms = dict(debounce_ms)
+        self.events = queue.Queue()
+        self.notify = None  # called from the input thread after each accepted press
+        self._last_ms = {pin: None for pin in self.pin_names}
+
+    def start(self):
+        pass
+
+    def close(self):
+        pass
+
+    def _press(self, pin, now_ms):
+        last = self._last_ms[pin]
+        if last is not None and now_ms - last < self.debounce_ms[pin]:
+            return
+        self._last_ms[pin] = now_ms
+        self.events.put(self.pin_names[pin])
+        if self.notify:
+            self.notify()
+
+    def pending(self):
+        """Names of all presses queued since the last call, oldest first."""
+        names = []
+        while True:
+            try:
+                names.append(self.events.get_nowait())
+            except queue.Empty:
+                return names
+
+
+class LgpioBackend(InputBackend):
+    """Falling-edge alerts (buttons pull to ground) delivered on lgpio's callback thread."""
+
+    GLITCH_US = 5000  # contact bounce filtered by lgpio before an alert is raised
+
+    def __init__(self, pin_names, debounce_ms, chip_number=0):
+        super().__init__(pin_names, debounce_ms)
+        self.chip_number = chip_number
+        self.chip = None
+        self._callbacks = []
+
+    def start(self):
+        self.chip = lgpio.gpiochip_open(self.chip_number)
+        for pin in self.pin_names:
+            lgpio.gpio_claim_alert(self.chip, pin, lgpio.FALLING_EDGE, lgpio.SET_PULL_UP)
+            lgpio.gpio_set_debounce_micros(self.chip, pin, self.GLITCH_US)
+            self._callbacks.append(lgpio.callback(self.chip, pin, lgpio.FALLING_EDGE, self._alert))
+
+    def _alert(self, chip, gpio, level, timestamp_ns):
+        if level == 0:
+            self._press(gpio, timestamp_ns // 1_000_000)
+
+    def close(self):
+        for cb in self._callbacks:
+            cb.cancel()
+        self._callbacks = []
+        if self.chip is not None:
+            try:
+                lgpio.gpiochip_close(self.chip)
+            except Exception:
+                pass
+            self.chip = None
+
+
+class SimulatedBackend(InputBackend):
+    def press(self, name, now_ms=None):
+        """Inject a press of the named button, subject to the same debounce."""
+        pin = next(p for p, n in self.pin_names.items() if n == name)
+        self._press(pin, int(time.monotonic() * 1000) if now_ms is None else now_ms)
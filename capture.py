@@ -0,0 +1,302 @@
+"""Raw serial capture and replay.
+
+``CaptureSerial`` wraps an open port and logs every chunk read from and
+written to it, with its time.monotonic() offset from the open, to a compact
+binary file: an 8-byte magic, a header (wall-clock start, initial baud
+rate), then one 13-byte record header (offset s, direction, length) plus the
+bytes per chunk. Rate switches are recorded too.
+
+``ReplaySerial`` stands in for ``serial.Serial``: it hands the captured
+received bytes to ``read`` at their recorded offsets, divided by ``speed``
+(0 replays as fast as the reader takes them, one captured chunk per read).
+What the app writes is kept in ``written`` and not checked. With ``follow_writes`` the replay clock
+stops at each captured write until the app writes something, so the
+board's answers follow the app's commands however slowly it sends them
+(e.g. a GUI waiting for buttons).
+
+    python capture.py info data/captures/serial-20240101-120000.cap
+    python capture.py replay data/captures/serial-20240101-120000.cap --speed 0
+"""
+
+import argparse
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from typing import NamedTuple
+
+import serial
+
+from sweep_reader import SweepReader
+from timing import recorder
+
+MAGIC = b"SERCAP1\n"
+HEADER = struct.Struct("<dI")     # wall-clock start, baud rate at open
+RECORD = struct.Struct("<dBI")    # monotonic offset (s), direction, length
+RX, TX, BAUD = 0, 1, 2            # BAUD records carry the new rate as 4 bytes
+FLUSH_INTERVAL_S = 0.5
+
+
+class Record(NamedTuple):
+    offset: float   # seconds since the port was opened
+    direction: int  # RX, TX or BAUD
+    data: bytes
+
+
+def capture_path(directory):
+    return os.path.join(directory, time.strftime("serial-%Y%m%d-%H%M%S.cap"))
+
+
+def read_capture(path):
+    """(wall-clock start, initial baud rate, list of Records) of a capture file.
+
+    A record cut short by a crash is ignored.
+    """
+    with open(path, "rb") as f:
+        blob = f.read()
+    if not blob.startswith(MAGIC):
+        raise ValueError(f"{path}: not a serial capture")
+    pos = len(MAGIC)
+    started, baudrate = HEADER.unpack_from(blob, pos)
+    pos += HEADER.size
+    records = []
+    while pos + RECORD.size <= len(blob):
+        offset, direction, length = RECORD.unpack_from(blob, pos)
+        pos += RECORD.size
+        if pos + length > len(blob):
+            break
+        records.append(Record(offset, direction, blob[pos:pos + length]))
+        pos += length
+    return started, baudrate, records
+
+
+class CaptureSerial:
+    """``ser`` with every read, write and rate change logged to ``path``."""
+
+    def __init__(self, ser, path):
+        self._ser = ser
+        self._lock = threading.Lock()  # read on the reader thread, write on the session thread
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + HEADER.pack(time.time(), ser.baudrate))
+        self._t0 = self._flushed = time.monotonic()
+        self.path = path
+
+    def _log(self, direction, data):
+        with self._lock:
+            if self._file.closed:
+                return
+            now = time.monotonic()
+            self._file.write(RECORD.pack(now - self._t0, direction, len(data)))
+            self._file.write(data)
+            if now - self._flushed >= FLUSH_INTERVAL_S:  # bounded loss if the app dies
+                self._file.flush()
+                self._flushed = now
+
+    def read(self, size=1):
+        data = self._ser.read(size)
+        if data:
+            self._log(RX, data)
+        return data
+
+    def write(self, data):
+        written = self._ser.write(data)
+        self._log(TX, bytes(data))
+        return written
+
+    @property
+    def baudrate(self):
+        return self._ser.baudrate
+
+    @baudrate.setter
+    def baudrate(self, rate):
+        self._ser.baudrate = rate
+        self._log(BAUD, struct.pack("<I", rate))
+
+    def close(self):
+        self._ser.close()
+        with self._lock:
+            self._file.close()
+
+    def __getattr__(self, name):  # in_waiting, timeout, port, reset_input_buffer, ...
+        return getattr(self._ser, name)
+
+
+class ReplaySerial:
+    """Read-side replay of a capture file in place of ``serial.Serial``."""
+
+    def __init__(self, path, speed=1.0, timeout=1.0, follow_writes=False):
+        try:
+            _, self.baudrate, records = read_capture(path)
+        except (OSError, ValueError, struct.error) as exc:
+            raise serial.SerialException(f"cannot replay {path}: {exc}") from exc
+        self.port = path
+        self.speed = speed
+        self.timeout = timeout
+        self.follow_writes = follow_writes
+        self.written = []
+        self.is_open = True
+        # (offset, bytes) of the received chunks; TX offsets for follow_writes
+        self._rx = [(r.offset, r.data) for r in records if r.direction == RX]
+        self._tx = [r.offset for r in records if r.direction == TX]
+        self._next_rx = 0
+        self._next_tx = 0
+        self._pending = bytearray()
+        self._anchor = (time.monotonic(), 0.0)  # (wall time, capture offset) the clock runs from
+        self._cond = threading.Condition()
+
+    # capture offset the replay has reached; stops at the next captured write with follow_writes
+    def _now(self):
+        wall, offset = self._anchor
+        now = float("inf") if self.speed <= 0 else offset + (time.monotonic() - wall) * self.speed
+        if self.follow_writes and self._next_tx < len(self._tx):
+            now = min(now, self._tx[self._next_tx])
+        return now
+
+    def _release(self):
+        """Move the received chunks that are due into the pending buffer; seconds until the next one."""
+        now = self._now()
+        # as fast as possible still hands out the captured chunks one at a time
+        while (self._next_rx < len(self._rx) and self._rx[self._next_rx][0] <= now
+               and (self.speed > 0 or not self._pending)):
+            self._pending += self._rx[self._next_rx][1]
+            self._next_rx += 1
+        if self._next_rx == len(self._rx):
+            return None
+        wait = self._rx[self._next_rx][0] - now
+        return wait / self.speed if self.speed > 0 and wait > 0 else None
+
+    @property
+    def finished(self):
+        """True once every captured byte has been read."""
+        with self._cond:
+            return self._next_rx == len(self._rx) and not self._pending
+
+    @property
+    def in_waiting(self):
+        with self._cond:
+            self._release()
+            return len(self._pending)
+
+    def read(self, size=1):
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._cond:
+            while self.is_open:
+                wait = self._release()
+                if self._pending:
+                    data = bytes(self._pending[:size])
+                    del self._pending[:size]
+                    return data
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                if wait is None or (remaining is not None and wait > remaining):
+                    wait = remaining
+                self._cond.wait(wait)  # woken early by write() with follow_writes
+            return b""
+
+    def write(self, data):
+        with self._cond:
+            self.written.append(bytes(data))
+            if self.follow_writes and self._next_tx < len(self._tx):
+                # the app sent its command: run on from the captured one
+                self._anchor = (time.monotonic(), self._tx[self._next_tx])
+                self._next_tx += 1
+                self._cond.notify_all()
+        return len(data)
+
+    def reset_input_buffer(self):
+        with self._cond:
+            self._pending.clear()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        with self._cond:
+            self.is_open = False
+            self._cond.notify_all()
+
+
+def open_serial(port, rate, timeout=1.0, capture_dir=None, replay=None, speed=1.0):
+    """``serial.Serial(port, rate)``, captured to ``capture_dir`` if set; ``replay`` replaces the port.
+
+    Every failure, including an unwritable capture directory, is a SerialException.
+    """
+    if replay:
+        return ReplaySerial(replay, speed, timeout=timeout, follow_writes=True)
+    if capture_dir:
+        try:
+            os.makedirs(capture_dir, exist_ok=True)
+        except OSError as exc:
+            raise serial.SerialException(f"cannot capture to {capture_dir}: {exc}") from exc
+    ser = serial.Serial(port, rate, timeout=timeout)
+    if not capture_dir:
+        return ser
+    try:
+        return CaptureSerial(ser, capture_path(capture_dir))
+    except OSError as exc:
+        ser.close()
+        raise serial.SerialException(f"cannot capture to {capture_dir}: {exc}") from exc
+
+
+def _info(path):
+    started, baudrate, records = read_capture(path)
+    rx = sum(len(r.data) for r in records if r.direction == RX)
+    tx = sum(len(r.data) for r in records if r.direction == TX)
+    duration = records[-1].offset if records else 0.0
+    print(f"{path}: started {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))} at {baudrate} baud")
+    print(f"{len(records)} records over {duration:.1f} s, {rx} bytes received, {tx} bytes sent")
+    for r in records:
+        if r.direction == BAUD:
+            print(f"  {r.offset:9.3f} s  baud {struct.unpack('<I', r.data)[0]}")
+        elif r.direction == TX and not r.data.strip(b"\x06"):
+            continue  # frame acks
+        elif r.direction == TX:
+            print(f"  {r.offset:9.3f} s  > {r.data.decode(errors='replace').strip()}")
+
+
+def _replay(path, speed, rows):
+    """Feed the capture through a SweepReader and report what it parsed."""
+    ser = ReplaySerial(path, speed, timeout=0.05)
+    reader = SweepReader(ser, rows=rows)
+    counts = {}
+    t0 = last = time.perf_counter()
+    reader.start()
+    while True:
+        try:
+            kind, _ = reader.events.get(timeout=0.2)
+        except queue.Empty:
+            if ser.finished:
+                break  # everything read and the reader has gone quiet
+            continue
+        counts[kind] = counts.get(kind, 0) + 1
+        last = time.perf_counter()
+    elapsed = last - t0
+    reader.stop()
+    print(f"replayed in {elapsed * 1e3:.1f} ms: " + ", ".join(f"{n} {kind}" for kind, n in sorted(counts.items())))
+    for name, (n, worst, p50, p95) in sorted(recorder.percentiles((50, 95)).items()):
+        print(f"  {name:15s} n={n:5d}  p50 {p50:8.2f} ms  p95 {p95:8.2f} ms  max {worst:8.2f} ms")
+    return 0 if "error" not in counts else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or replay a raw serial capture.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="summary and the commands sent")
+    info.add_argument("path")
+    replay = sub.add_parser("replay", help="parse the capture with SweepReader and time it")
+    replay.add_argument("path")
+    replay.add_argument("--speed", type=float, default=0.0, help="x real time; 0: as fast as possible")
+    replay.add_argument("--rows", type=int, default=6, help="2 x channels of the captured board")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        _info(args.path)
+        return 0
+    return _replay(args.path, args.speed, args.rows)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
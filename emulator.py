@@ -0,0 +1,208 @@
+"""Arduino emulator on a pseudo-terminal.
+
+Speaks the firmware's command protocol (``init_start``, ``start``, their
+``_bin`` variants with chunk acknowledgements, ``temp``, and the link
+commands ``baud``/``ping``/``probe``) with synthetic three-channel resonance
+sweeps. Noise, ovf/nan injection, the init -> normal peak shift, the
+per-value pacing of the ASCII rows and the highest rate the "cable"
+carries are configurable. The GUI or the benchmarks can open
+``emulator.port`` like the real /dev/ttyACM0.
+
+    python emulator.py --pacing 0.01      # prints the pty path, Ctrl-C to stop
+"""
+
+import argparse
+import os
+import pty
+import select
+import threading
+import time
+import tty
+
+import numpy as np
+
+from scoring import NUM_INCREMENTS, START_FREQUENCIES, STEP_SIZE
+from sweep_frame import FRAME_ACK, FRAME_CHUNK, FRAME_WINDOW, encode_frame
+
+
+def resonance(start_frequency, center_offset, q=300.0, coupling=0.6,
+              points=NUM_INCREMENTS, step=STEP_SIZE):
+    """(phase in degrees, magnitude) of a resonator swept from ``start_frequency``."""
+    f = start_frequency + np.arange(points) * step
+    f0 = start_frequency + center_offset
+    response = 1.0 + coupling / (1.0 + 2j * q * (f - f0) / f0)
+    return np.degrees(np.angle(response)), 1000.0 * np.abs(response)
+
+
+class DeviceEmulator(threading.Thread):
+    def __init__(self, noise=0.2, invalid_rate=0.0, peak_shift=6.0, pacing=0.0,
+                 sweep_time=0.0, read_timeout=0.05, banner=True, seed=None,
+                 start_frequencies=START_FREQUENCIES, max_rate=1000000, ack_timeout=1.0):
+        super().__init__(name="device-emulator", daemon=True)
+        self.noise = noise
+        self.invalid_rate = invalid_rate
+        self.peak_shift = peak_shift      # Hz between init and normal sweep
+        self.pacing = pacing              # seconds after every value, delay(10) on the board
+        self.sweep_time = sweep_time      # seconds spent "sweeping" before sending
+        self.read_timeout = read_timeout  # idle timeout ending a command without '\n'
+        self.max_rate = max_rate          # "ping" is lost above this rate
+        self.ack_timeout = ack_timeout    # FRAME_ACK_TIMEOUT
+        self.rate = 115200
+        self._offered_rate = None
+        self.banner = banner
+        self.start_frequencies = start_frequencies
+        self.rng = np.random.default_rng(seed)
+        self.temperature = 21.5
+        self.humidity = 45.0
+        self.commands = []                # every command received, for tests
+        self._backlog = b""               # command bytes read while sending a frame
+        self._stop_event = threading.Event()
+        self._master, slave = pty.openpty()
+        tty.setraw(slave)
+        self._slave = slave
+        self.port = os.ttyname(slave)
+
+    # -------------------- data --------------------
+    def sweep(self, shifted):
+        """(rows, points) array: phase1, mag1, phase2, mag2, phase3, mag3."""
+        rows = []
+        for channel, start in enumerate(self.start_frequencies):
+            offset = 200.0 + 40.0 * channel + (self.peak_shift if shifted else 0.0)
+            phase, magnitude = resonance(start, offset)
+            rows.append(phase + self.rng.normal(0, self.noise, phase.size))
+            rows.append(magnitude + self.rng.normal(0, self.noise * 10, magnitude.size))
+        return np.array(rows)
+
+    def _env(self):
+        self.temperature += self.rng.normal(0, 0.02)
+        return self.temperature, self.humidity + self.rng.normal(0, 0.1)
+
+    def ascii_rows(self, data):
+        """Rows formatted like Serial.print(float), with ovf/nan injected."""
+        lines = []
+        for row in data:
+            tokens = [f"{v:.2f}" for v in row]
+            if self.invalid_rate:
+                for i in np.flatnonzero(self.rng.random(row.size) < self.invalid_rate):
+                    tokens[i] = "ovf" if self.rng.random() < 0.5 else "nan"
+            lines.append(tokens)
+        return lines
+
+    # -------------------- wire --------------------
+    def _write(self, data: bytes):
+        os.write(self._master, data)
+
+    def _send_frame(self, frame: bytes):
+        """Write ``frame`` in FRAME_CHUNK pieces, spending one credit per chunk like the firmware."""
+        credits = FRAME_WINDOW
+        for start in range(0, len(frame), FRAME_CHUNK):
+            deadline = time.monotonic() + self.ack_timeout
+            while not credits:
+                remaining = deadline - time.monotonic()
+                ready, _, _ = select.select([self._master], [], [], max(0.0, remaining))
+                if not ready:
+                    return  # host stopped acking; abort like the board
+                data = os.read(self._master, 64)
+                credits += data.count(FRAME_ACK)
+                self._backlog += data.replace(FRAME_ACK, b"")  # the next command, like commandBacklog
+            credits -= 1
+            self._write(frame[start:start + FRAME_CHUNK])
+
+    def _send_sweep(self, shifted, binary):
+        if self.sweep_time:
+            time.sleep(self.sweep_time)
+        data = self.sweep(shifted)
+        temperature, humidity = self._env()
+        if binary:
+            frame = data.reshape(len(self.start_frequencies), 2, -1)
+            self._send_frame(encode_frame(frame, temperature=temperature, humidity=humidity))
+            return
+        for tokens in self.ascii_rows(data):
+            if self.pacing:
+                for token in tokens[:-1]:
+                    self._write(token.encode() + b",")
+                    time.sleep(self.pacing)
+                self._write(tokens[-1].encode() + b",\r\n")
+                time.sleep(self.pacing)
+            else:
+                self._write(",".join(tokens).encode() + b",\r\n")
+        self._write(f"{temperature:.2f}&{humidity:.2f}\r\n".encode())
+
+    def handle(self, command: str):
+        self.commands.append(command)
+        if command in ("init_start", "start", "init_start_bin", "start_bin"):
+            self._send_sweep(shifted=command.startswith("start"), binary=command.endswith("_bin"))
+        elif command == "temp":
+            temperature, humidity = self._env()
+            self._write(f"{temperature:.2f}&{humidity:.2f}\r\n".encode())
+        elif command.startswith("baud "):
+            self._offered_rate = int(command[5:])
+            self._write(f"baud {self._offered_rate}\r\n".encode())
+        elif command == "ping":
+            # only heard if the offered rate is one the cable carries
+            if self._offered_rate is not None and self._offered_rate <= self.max_rate:
+                self.rate = self._offered_rate
+                self._write(b"pong\r\n")
+            self._offered_rate = None
+        elif command.startswith("probe "):
+            self._write(b"U" * int(command[6:]) + b"\r\n")
+
+    def run(self):
+        if self.banner:
+            self._write(b"starting\r\n")
+        pending = b""
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([self._master], [], [], self.read_timeout)
+            if ready:
+                try:
+                    pending += os.read(self._master, 1024)
+                except OSError:
+                    break
+                while b"\n" in pending:
+                    line, pending = pending.split(b"\n", 1)
+                    self.handle(line.decode("utf-8", errors="replace").strip())
+                    pending += self._backlog
+                    self._backlog = b""
+                continue
+            if pending:
+                # no '\n': the command ends when the line goes idle, like Serial.readString()
+                self.handle(pending.decode("utf-8", errors="replace").strip())
+                pending = b""
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(1.0)
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Emulate the AmiNIC board on a pty.")
+    parser.add_argument("--noise", type=float, default=0.2)
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="fraction of ovf/nan values")
+    parser.add_argument("--peak-shift", type=float, default=6.0, help="Hz, init -> normal")
+    parser.add_argument("--pacing", type=float, default=0.0, help="seconds per value (board: 0.01)")
+    parser.add_argument("--sweep-time", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    emulator = DeviceEmulator(noise=args.noise, invalid_rate=args.invalid_rate,
+                              peak_shift=args.peak_shift, pacing=args.pacing,
+                              sweep_time=args.sweep_time, seed=args.seed)
+    emulator.start()
+    print(emulator.port, flush=True)
+    try:
+        while emulator.is_alive():
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Background BME680 sampling while the device is idle.
+
+``EnvSampler`` sends ``temp`` every ``interval_s`` while no measurement is
+running and keeps the answers in an ``EnvCache``: the latest reading with a
+time-to-live plus a short history. The Temperature screen and the baseline
+check read the cache instead of waiting on a round trip to the board, and
+the results screen takes the temperature drift from the history.
+
+Everything runs on the Tk thread (``root.after``), like the screen pollers.
+"""
+
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from analysis import read_environment
+
+
+class EnvReading(NamedTuple):
+    temperature: float
+    humidity: Optional[float]
+    timestamp: float  # time.monotonic()
+
+
+class EnvCache:
+    def __init__(self, ttl_s=30.0, history=64):
+        self.ttl_s = ttl_s
+        self.history = deque(maxlen=history)
+
+    def update(self, temperature, humidity=None, now=None):
+        reading = EnvReading(temperature, humidity, time.monotonic() if now is None else now)
+        self.history.append(reading)
+        return reading
+
+    def latest(self, now=None):
+        """The newest reading, or None if there is none younger than the TTL."""
+        if not self.history:
+            return None
+        reading = self.history[-1]
+        now = time.monotonic() if now is None else now
+        return reading if now - reading.timestamp <= self.ttl_s else None
+
+    def drift(self, window_s=600.0, now=None):
+        """Temperature trend in °C per minute over the last ``window_s``, or None."""
+        now = time.monotonic() if now is None else now
+        recent = [r for r in self.history if now - r.timestamp <= window_s]
+        if len(recent) < 2 or recent[-1].timestamp - recent[0].timestamp < 1.0:
+            return None
+        t = np.array([r.timestamp for r in recent])
+        temperature = np.array([r.temperature for r in recent])
+        return float(np.polyfit(t - t[0], temperature, 1)[0] * 60.0)
+
+
+class EnvSampler:
+    """Requests ``temp`` through ``session`` periodically while resumed and feeds the answers to ``cache``."""
+
+    def __init__(self, root, session, cache, interval_s=10.0, poll_ms=200):
+        self.root = root
+        self.session = session
+        self.cache = cache
+        self.interval_s = interval_s
+        self.poll_ms = poll_ms
+        self.paused = True
+        self._last_request = -float("inf")
+        self._pending = None  # Future of the request in flight
+        self._job = None
+
+    def resume(self):
+        if self.paused:
+            self.paused = False
+            self._tick()
+
+    def pause(self):
+        """Stop sampling; a request in flight is still answered before later commands."""
+        self.paused = True
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def request_now(self):
+        """Future of a fresh 'temp&hum' line: the request in flight, or one sent right away.
+
+        A failed request is dropped by the sampler, so waiters should watch
+        this Future rather than the cache.
+        """
+        self._collect()
+        if self._pending is None:
+            self._pending = self.session.temp()
+            self._last_request = time.monotonic()
+        return self._pending
+
+    def _collect(self):
+        """Put the answer of a finished request into the cache."""
+        if self._pending is not None and self._pending.done():
+            if self._pending.exception() is None:
+                reading = read_environment(self._pending.result())
+                if reading is not None:
+                    self.cache.update(*reading)
+            self._pending = None
+
+    def _tick(self):
+        self._job = None
+        if self.paused:
+            return
+        self._collect()
+        now = time.monotonic()
+        if self._pending is None and now - self._last_request >= self.interval_s:
+            self._pending = self.session.temp()
+            self._last_request = now
+        self._job = self.root.after(self.poll_ms, self._tick)
@@ -0,0 +1,100 @@
+"""Batched Savitzky-Golay feature extraction for init/normal sweep pairs.
+
+The filter coefficients and the edge fit are cached per (window_length,
+polyorder): filtering every row of one measurement, or of a whole archive,
+is one convolution along the last axis, O(N * window_length) per row, plus
+a small matmul for each edge. The result equals savgol_filter with its
+default "interp" mode: the first and last half window come from the
+polynomial fitted to the first and last window_length points.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+from scipy.ndimage import convolve1d  # type: ignore
+from scipy.signal import savgol_coeffs, savgol_filter  # type: ignore
+
+
+@lru_cache(maxsize=8)
+def savgol_kernel(window_length: int, polyorder: int):
+    """(convolution coefficients, window_length x window_length matrix of the edge fit)."""
+    coeffs = savgol_coeffs(window_length, polyorder)
+    # on exactly one window every output point comes from the same polynomial fit
+    edges = savgol_filter(np.eye(window_length), window_length, polyorder, axis=0)
+    coeffs.setflags(write=False)
+    edges.setflags(write=False)
+    return coeffs, edges
+
+
+def savgol_batch(data, window_length: int, polyorder: int) -> np.ndarray:
+    """savgol_filter along the last axis of ``data``, using the cached kernel."""
+    data = np.asarray(data, dtype=np.float64)
+    n = data.shape[-1]
+    if n < window_length:
+        return savgol_filter(data, window_length, polyorder, axis=-1)  # raises like the scipy call
+    coeffs, edges = savgol_kernel(window_length, polyorder)
+    half = window_length // 2
+    out = convolve1d(data, coeffs, axis=-1, mode="constant")
+    out[..., :half] = data[..., :window_length] @ edges[:half].T
+    out[..., n - half:] = data[..., n - window_length:] @ edges[window_length - half:].T
+    return out
+
+
+def parabolic_peak(y):
+    """Sub-bin argmax along the last axis: index of the vertex of the parabola through the maximum."""
+    n = y.shape[-1]
+    k = y.argmax(axis=-1)
+    inner = np.clip(k, 1, n - 2)[..., None]
+    left, centre, right = (np.take_along_axis(y, inner + d, axis=-1)[..., 0] for d in (-1, 0, 1))
+    denominator = left - 2.0 * centre + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        offset = np.where(denominator < 0, 0.5 * (left - right) / denominator, 0.0)
+    # a maximum on the first or last bin has no neighbour on one side
+    offset = np.where((k == 0) | (k == n - 1), 0.0, offset)
+    return k + np.clip(offset, -0.5, 0.5)
+
+
+class SweepFeatures(NamedTuple):
+    init_peaks: np.ndarray       # argmax of filtered init phase, per channel
+    normal_peaks: np.ndarray     # argmax of filtered normal phase, per channel
+    phase_shift: np.ndarray      # |init_peaks - normal_peaks|
+    init_mag_span: np.ndarray    # |argmax - argmin| of filtered init magnitude
+    normal_mag_span: np.ndarray
+    mag_span_diff: np.ndarray    # |init_mag_span - normal_mag_span|
+
+    @property
+    def quality(self):
+        """Phase peak shifts as the tuple shown on the results screen."""
+        return tuple(int(v) for v in self.phase_shift)
+
+
+class FeatureEngine:
+    """Scores stacks shaped (..., 2, rows, N): [init, normal] x [phase1, mag1, phase2, ...]."""
+
+    def __init__(self, window_length=31, polyorder=3):
+        self.window_length = window_length
+        self.polyorder = polyorder
+
+    def filter(self, data):
+        return savgol_batch(data, self.window_length, self.polyorder)
+
+    def extract(self, stack) -> SweepFeatures:
+        """Features for one (2, rows, N) stack or a batch of them."""
+        return self.from_filtered(self.filter(stack))
+
+    def from_filtered(self, filtered) -> SweepFeatures:
+        """Features of a stack that already went through ``filter``."""
+        peaks = filtered[..., 0::2, :].argmax(axis=-1)
+        magnitude = filtered[..., 1::2, :]
+        spans = np.abs(magnitude.argmax(axis=-1) - magnitude.argmin(axis=-1))
+        init_peaks, normal_peaks = peaks[..., 0, :], peaks[..., 1, :]
+        init_span, normal_span = spans[..., 0, :], spans[..., 1, :]
+        return SweepFeatures(
+            init_peaks, normal_peaks, np.abs(init_peaks - normal_peaks),
+            init_span, normal_span, np.abs(init_span - normal_span),
+        )
+
+    def extract_pair(self, init, normal) -> SweepFeatures:
+        """Features for one measurement given its (rows, N) init and normal sweeps."""
+        return self.extract(np.stack([init, normal]))
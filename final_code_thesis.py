@@ -1,15 +1,32 @@
 # @ & |
 
+import functools
+import os
+import queue
+import time
 import tkinter as tk
 from tkinter import BOTH, ttk
-import lgpio
 
-import serial
-import time
 import numpy as np
-from scipy.signal import savgol_filter  # type: ignore
 
-time.sleep(5)
+from adaptive import AdaptiveMeasurement, ConvergencePolicy
+from analysis import WINDOW_LENGTH, POLYORDER, read_environment
+from archive import MeasurementArchive
+from baseline_cache import BaselineCache, StalenessPolicy
+from boot import BootSequencer, log_boot
+from buttons import LgpioBackend, SimulatedBackend, lgpio
+from capture import open_serial
+from env_sampler import EnvCache, EnvSampler
+from scoring import START_FREQUENCIES, STEP_SIZE, Calibration, ScoringEngine
+from screens import ScreenManager
+from sweep_model import Sweep
+from serial_session import SerialSession
+from features import FeatureEngine
+from history import MeasurementHistory
+from link import BOOT_RATE, RATES
+from live_plot import LivePlot
+from timing import recorder, span
+from trend_plot import TrendPlot
 
 # -------------------- Global scaling --------------------
 SCALE = 0.5  # 0.5 => 480x640 becomes 240x320
@@ -32,14 +49,90 @@ BASE_W, BASE_H = 480, 640
 WIN_W, WIN_H   = S(BASE_W), S(BASE_H)
 
 # -------------------- Serial communication --------------------
-SERIAL_PORT = '/dev/ttyACM0'
-SERIAL_RATE = 9600
-ser = serial.Serial(SERIAL_PORT, SERIAL_RATE, timeout=1)
-ser.reset_input_buffer()
-
-# Savitzky-Golay filter setup
-window_length = 31
-polyorder = 3
+SERIAL_PORT = '/dev/ttyACM0'  # fallback when no Arduino is autodetected
+SERIAL_PORT_OVERRIDE = os.environ.get("AMINIC_SERIAL_PORT")  # e.g. the pty printed by emulator.py
+SERIAL_RATE = BOOT_RATE  # what the firmware boots at; faster SERIAL_RATES are negotiated after boot
+SERIAL_RATES = RATES     # () keeps SERIAL_RATE
+# capture mode: log every byte to and from the board to a file in this directory (see capture.py)
+SERIAL_CAPTURE_DIR = os.environ.get("AMINIC_CAPTURE_DIR")
+# replay mode: play a capture file back instead of opening a port, at N x real time (0: no waiting)
+SERIAL_REPLAY = os.environ.get("AMINIC_REPLAY")
+SERIAL_REPLAY_SPEED = float(os.environ.get("AMINIC_REPLAY_SPEED", "1"))
+
+# opened by the boot sequence; all reads happen on the reader thread, and once
+# the board is up every command goes through the session, which hands the UI
+# futures to poll
+ser = None
+reader = None
+session = None
+
+# the board sends nothing until every channel is swept: frequencySweep waits
+# 20 ms per point, 3 x 501 x 20 ms = 30.1 s plus settling, so allow twice that.
+# Sweeps are never resent (see serial_session.py).
+SWEEP_TIMEOUT_S = 75       # until the board starts sending a sweep
+SWEEP_IDLE_TIMEOUT_S = 5   # silence allowed in the middle of one
+TEMP_TIMEOUT_S = 3
+
+# "binary" (one flow-controlled frame, see sweep_frame.py) or "ascii" (text rows,
+# paced by the firmware at 10 ms per value; kept for older firmware)
+SWEEP_FORMAT = "binary"
+
+def sweep_command(name: str) -> bytes:
+    """Sweep command in the configured transfer format."""
+    if SWEEP_FORMAT == "binary":
+        return f"{name}_bin".encode()
+    return name.encode()
+
+def request_sweep(name: str):
+    """Queue a sweep command; returns the Future of its SweepResult."""
+    return session.sweep(sweep_command(name), SWEEP_TIMEOUT_S, SWEEP_IDLE_TIMEOUT_S, retries=0)
+
+feature_engine = FeatureEngine(WINDOW_LENGTH, POLYORDER)
+
+# "single": one sweep after the fixed hold countdown;
+# "adaptive": repeat the normal sweep until the peak estimates converge. Each
+# sweep is >= 30 s on the board, so adaptive holds the probe for 60 s to
+# max_sweeps x 30 s (here 2 min) instead of one sweep: confidence, not speed.
+MEASUREMENT_MODE = "single"
+ADAPTIVE_POLICY = ConvergencePolicy(tolerance=1.0, min_sweeps=2, max_sweeps=4)
+
+# -------------------- Measurement archive --------------------
+DATA_DIR = "/home/raspi/internship"
+archive = None  # MeasurementArchive, created by main()
+
+# timing spans (timing.py) are appended here after every measurement; None disables
+TIMING_LOG = f"{DATA_DIR}/timings.jsonl"
+measurement_started = None  # perf_counter() when START was pressed
+
+# -------------------- Baseline (init sweep) cache --------------------
+SWEEP_ROWS = 2 * len(START_FREQUENCIES)  # phase and magnitude row per channel
+BASELINE_MAX_AGE_S = 30 * 60
+BASELINE_MAX_TEMP_DRIFT = 1.0  # °C
+baseline_cache = BaselineCache(
+    f"{DATA_DIR}/init_baseline.npz",
+    START_FREQUENCIES,
+    StalenessPolicy(BASELINE_MAX_AGE_S, BASELINE_MAX_TEMP_DRIFT),
+)
+
+# -------------------- Quality score --------------------
+# shift (Hz) -> score table, see scoring.Calibration; without the file the score is the mean shift in Hz
+CALIBRATION_FILE = f"{DATA_DIR}/calibration.json"
+SHIFT_METHOD = "peak"  # or "xcorr": whole-curve cross-correlation, see shift.py
+scoring_engine = ScoringEngine(
+    START_FREQUENCIES, STEP_SIZE,
+    window_length=WINDOW_LENGTH, polyorder=POLYORDER, method=SHIFT_METHOD,
+    calibration=Calibration.load(CALIBRATION_FILE) if os.path.exists(CALIBRATION_FILE) else Calibration(),
+)
+
+# -------------------- Measurement history (trend screen) --------------------
+HISTORY_CAPACITY = 256  # last measurements kept in memory
+history = MeasurementHistory(HISTORY_CAPACITY, len(START_FREQUENCIES))
+
+# -------------------- Environment (BME680) sampling --------------------
+ENV_SAMPLE_INTERVAL_S = 10  # `temp` request period while idle
+ENV_TTL_S = 30              # older readings are not shown as current
+env_cache = EnvCache(ENV_TTL_S)
+env_sampler = None  # EnvSampler, created once the device is ready
 
 # -------------------- GPIO pins (BCM) --------------------
 ARROW_DOWN_GPIO  = 17
@@ -47,10 +140,6 @@ ARROW_LEFT_GPIO  = 23
 ARROW_RIGHT_GPIO = 27
 OK_GPIO          = 22
 
-chip = lgpio.gpiochip_open(0)
-for pin in [ARROW_DOWN_GPIO, ARROW_LEFT_GPIO, ARROW_RIGHT_GPIO, OK_GPIO]:
-    lgpio.gpio_claim_input(chip, pin, lgpio.SET_PULL_UP)
-
 PIN_TO_NAME = {
     OK_GPIO: "ok",
     ARROW_DOWN_GPIO: "down",
@@ -65,8 +154,8 @@ DEBOUNCE_MS = {
     ARROW_RIGHT_GPIO: 300,
 }
 
-_prev_level = {pin: 1 for pin in PIN_TO_NAME}
-_last_ts_ms = {pin: 0 for pin in PIN_TO_NAME}
+# LgpioBackend on the Pi, SimulatedBackend (keyboard/tests) elsewhere
+input_backend = None
 
 ACTIVE_HANDLERS = {"ok": None, "down": None, "left": None, "right": None}
 
@@ -74,218 +163,325 @@ def set_active_handlers(mapping):
     for key in ACTIVE_HANDLERS:
         ACTIVE_HANDLERS[key] = mapping.get(key, None)
 
-def _now_ms():
-    return int(time.time() * 1000)
-
-def poll_buttons():
-    now = _now_ms()
-    for pin, name in PIN_TO_NAME.items():
-        level = lgpio.gpio_read(chip, pin)  # 1 idle, 0 pressed
-        if _prev_level[pin] == 1 and level == 0:
-            if (now - _last_ts_ms[pin]) >= DEBOUNCE_MS[pin]:
-                _last_ts_ms[pin] = now
-                handler = ACTIVE_HANDLERS.get(name)
-                if handler:
-                    handler()
-        _prev_level[pin] = level
-    root.after(10, poll_buttons)
+def dispatch_buttons(event=None):
+    """Run the active handler for every press queued by the input backend."""
+    for name in input_backend.pending():
+        handler = ACTIVE_HANDLERS.get(name)
+        if handler:
+            handler()
+
+def start_buttons():
+    """Dispatch presses as they arrive; poll slowly only if Tcl cannot take cross-thread events."""
+    global input_backend
+    if lgpio is None:
+        input_backend = SimulatedBackend(PIN_TO_NAME, DEBOUNCE_MS)
+        for key, name in (("<Return>", "ok"), ("<Down>", "down"), ("<Left>", "left"), ("<Right>", "right")):
+            root.bind(key, lambda e, name=name: input_backend.press(name))
+        input_backend.notify = dispatch_buttons  # key presses already run on the Tk thread
+    else:
+        input_backend = LgpioBackend(PIN_TO_NAME, DEBOUNCE_MS)
+        if root.tk.eval("set tcl_platform(threaded)") == "1":
+            root.bind("<<ButtonPress>>", dispatch_buttons)
+            input_backend.notify = lambda: root.event_generate("<<ButtonPress>>", when="tail")
+        else:
+            def poll():
+                dispatch_buttons()
+                root.after(50, poll)
+            poll()
+    input_backend.start()
 
 # -------------------- UI & App Logic --------------------
 
-root = tk.Tk()
+root = None
 W, H = 240, 320
 SW, SH = 1920, 1080
 X = (SW - W) // 2
 Y = (SH - H) // 2
-root.geometry(f"{W}x{H}+{X}+{Y}")
 
 DEFAULT_BUTTON_COLOR = "#f0f0f0"
 current_screen = None
-focused_button = None
+screens = None  # ScreenManager, created by main()
 
-def remove_nan_ovf(array):
-    i = 0
-    while i < len(array):
-        if array[i] == "ovf" or array[i] == "nan":
-            array[i] = 0
-        else:
-            i += 1
-    return array
-
-def filter_and_find_peaks(data, window_length, polyorder):
-    filtered_data = savgol_filter(data, window_length, polyorder)
-    peak_index = np.argmax(filtered_data)
-    min_index = np.argmin(filtered_data)
-    return abs(peak_index - min_index)
-
-def update_focus(button):
-    global focused_button
-    if focused_button:
-        try:
-            focused_button.config(bg=DEFAULT_BUTTON_COLOR)
-        except tk.TclError:
-            pass
+def update_focus(button, screen=None):
+    """Highlight ``button``; focus is remembered per screen."""
+    screen = screen or screens.current
+    if screen.focus is not None and screen.focus is not button:
+        screen.focus.config(bg=DEFAULT_BUTTON_COLOR)
     button.config(bg="green")
-    focused_button = button
+    screen.focus = button
 
-# -------- Page 1 - booting screen --------
-def show_circle_with_text():
+def switch_to(name, build):
+    """Raise a cached screen (building it on first use) and activate its handlers."""
     global current_screen
-    current_screen = "circle"
-    set_active_handlers({})
-
-    for w in root.winfo_children():
-        w.destroy()
+    current_screen = name
+    screen = screens.show(name, build)
+    set_active_handlers(screen.handlers)
+    return screen
 
-    canvas = tk.Canvas(root, width=WIN_W, height=WIN_H, highlightthickness=0)
+# -------- Page 1 - booting screen --------
+def build_circle_screen(scr):
+    canvas = tk.Canvas(scr.frame, width=WIN_W, height=WIN_H, highlightthickness=0)
     canvas.pack(fill=BOTH, expand=True)
 
     canvas.create_oval(S(80), S(160), S(400), S(480), outline="black", width=S(2), tags="circle")
     canvas.create_text(S(240), S(320), text="AmiNIC", font=F("Arial", 48), fill="black", tags="circle_text")
+    status = canvas.create_text(S(240), S(560), text="", font=F("Arial", 20), fill="black")
+    scr.set_status = lambda text: canvas.itemconfig(status, text=text)
 
-    root.after(5000, home_screen)
+def show_circle_with_text():
+    scr = switch_to("circle", build_circle_screen)
+    scr.set_status("")
+    start_boot(scr.set_status)
+
+def start_boot(set_status):
+    """Connect to the device in the background; go home as soon as it is ready."""
+    opener = functools.partial(open_serial, capture_dir=SERIAL_CAPTURE_DIR,
+                               replay=SERIAL_REPLAY, speed=SERIAL_REPLAY_SPEED)
+    boot = BootSequencer(SERIAL_RATE, port=SERIAL_REPLAY or SERIAL_PORT_OVERRIDE, default_port=SERIAL_PORT,
+                         rows=SWEEP_ROWS, rates=SERIAL_RATES, opener=opener)
+    boot.start()
+
+    def wait_for_boot():
+        global ser, reader, session, env_sampler
+        if boot.is_alive():
+            root.after(50, wait_for_boot)
+            return
+        result = boot.result
+        log_boot(result, f"{DATA_DIR}/boot_times.jsonl")  # phase timings, rate and throughput
+        if result.error:
+            set_status(result.error)
+            root.after(2000, start_boot, set_status)
+            return
+        ser, reader = result.ser, result.reader
+        session = SerialSession(ser, reader)
+        session.start()
+        env_sampler = EnvSampler(root, session, env_cache, ENV_SAMPLE_INTERVAL_S)
+        home_screen()
+
+    wait_for_boot()
 
 # -------- Page 2 - home screen (now with Temperature) --------
-def home_screen():
-    global current_screen, focused_button
-    current_screen = "home"
+def build_home_screen(scr):
+    # Buttons: New Measurement, Temperature, Trend, TURN OFF
+    button1 = tk.Button(scr.frame, text="New Measurement", font=F("Arial", 28), bg=DEFAULT_BUTTON_COLOR)
+    button1.place(x=S(60), y=S(120), width=S(360), height=S(80))
 
-    for widget in root.winfo_children():
-        widget.destroy()
+    button2 = tk.Button(scr.frame, text="Temperature", font=F("Arial", 28), bg=DEFAULT_BUTTON_COLOR)
+    button2.place(x=S(60), y=S(220), width=S(360), height=S(80))
 
-    # Buttons: New Measurement, Temperature, TURN OFF
-    button1 = tk.Button(root, text="New Measurement", font=F("Arial", 28), bg=DEFAULT_BUTTON_COLOR)
-    button1.place(x=S(60), y=S(160), width=S(360), height=S(80))
+    button4 = tk.Button(scr.frame, text="Trend", font=F("Arial", 28), bg=DEFAULT_BUTTON_COLOR)
+    button4.place(x=S(60), y=S(320), width=S(360), height=S(80))
 
-    button2 = tk.Button(root, text="Temperature", font=F("Arial", 28), bg=DEFAULT_BUTTON_COLOR)
-    button2.place(x=S(60), y=S(260), width=S(360), height=S(80))
-
-    button3 = tk.Button(root, text="TURN OFF", font=F("Arial", 28), bg=DEFAULT_BUTTON_COLOR)
-    button3.place(x=S(140), y=S(360), width=S(200), height=S(80))
+    button3 = tk.Button(scr.frame, text="TURN OFF", font=F("Arial", 28), bg=DEFAULT_BUTTON_COLOR)
+    button3.place(x=S(140), y=S(420), width=S(200), height=S(80))
 
     # Start with button1 focused
-    update_focus(button1)
+    update_focus(button1, scr)
 
-    buttons_order = [button1, button2, button3]
+    buttons_order = [button1, button2, button4, button3]
 
     def focus_down():
-        # cycle focus through 1 -> 2 -> 3 -> 1 ...
-        idx = buttons_order.index(focused_button)
+        # cycle focus through 1 -> 2 -> 4 -> 3 -> 1 ...
+        idx = buttons_order.index(scr.focus)
         next_btn = buttons_order[(idx + 1) % len(buttons_order)]
         update_focus(next_btn)
 
     def ok_action():
-        if focused_button == button1:
-            ser.write(b"init_start")
-            show_loading_screen()
-        elif focused_button == button2:
-            ser.write(b"temp")
-            show_temperature_loading()
-        elif focused_button == button3:
+        if scr.focus is button1:
+            start_new_measurement()
+        elif scr.focus is button2:
+            show_temperature()
+        elif scr.focus is button4:
+            show_trend_screen()
+        elif scr.focus is button3:
             blank_screen()
 
-    set_active_handlers({"down": focus_down, "ok": ok_action})
+    # "right" has no visible button here: it opens the hidden diagnostics screen
+    scr.handlers = {"down": focus_down, "ok": ok_action, "right": show_diagnostics_screen}
 
-# -------- Page 0 - blank / turn off --------
-def blank_screen():
-    global current_screen
-    current_screen = "blank"
+def home_screen():
+    switch_to("home", build_home_screen)
+    env_sampler.resume()  # idle: keep the temperature cache warm
 
-    for widget in root.winfo_children():
-        widget.destroy()
+# -------- Page 0 - blank / turn off --------
+def build_blank_screen(scr):
+    tk.Label(scr.frame, text="Turning off...", font=F("Arial", 28)).pack(pady=S(200))
 
-    set_active_handlers({})
-    tk.Label(root, text="Turning off...", font=F("Arial", 28)).pack(pady=S(200))
+def blank_screen():
+    switch_to("blank", build_blank_screen)
+    env_sampler.pause()
     root.after(2000, home_screen)
 
-# -------- Page 3 - initial sweep / loading --------
-def show_loading_screen():
-    global current_screen
-    current_screen = "loading"
-
-    set_active_handlers({})
+def device_error(exc):
+    """A command failed: say so, then go home, or boot again if the link is gone."""
+    scr = switch_to("circle", build_circle_screen)  # hiding the screen stops its timers
+    scr.set_status(str(exc))
+    if reader.is_alive():
+        root.after(3000, home_screen)
+        return
+    # unplugged or reset: every later command on this session would fail too
+    env_sampler.pause()
+    session.close()
+    reader.stop()
+    ser.close()
+    root.after(3000, start_boot, scr.set_status)
+
+def when_done(future, callback, interval_ms=50):
+    """Call ``callback(result)`` on the Tk thread once ``future`` resolves."""
+    def check():
+        if not future.done():
+            root.after(interval_ms, check)
+        elif future.exception() is not None:
+            device_error(future.exception())
+        else:
+            callback(future.result())
+
+    check()
+
+def stream_sweep(plot, future, on_sweep, on_progress=None):
+    """Draw rows on ``plot`` as they stream in; call ``on_sweep(Sweep)`` once ``future`` has the sweep."""
+    plot.reset()
+
+    def pump():
+        done = future.done()  # checked first, so every partial row of this sweep is drained below
+        while True:
+            try:
+                kind, payload = session.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "partial":
+                plot.add(*payload)
+                if on_progress:
+                    row, start, values = payload
+                    on_progress((row * plot.points + start + values.size) / (plot.rows * plot.points))
+        if not done:
+            plot.redraw()
+            root.after(100, pump)
+        elif future.exception() is not None:
+            device_error(future.exception())
+        else:
+            sweep = Sweep.from_result(future.result(), START_FREQUENCIES, STEP_SIZE)
+            plot.add_sweep(sweep.rows)
+            plot.redraw()
+            on_sweep(sweep)
+
+    pump()
+
+def sweep_environment(sweep):
+    """(temperature, humidity) sent with ``sweep``; 0.0/0.0 when there was no reading (see read_environment)."""
+    if sweep.humidity is None:
+        return 0.0, 0.0
+    return sweep.temperature, sweep.humidity
+
+def start_new_measurement():
+    """Stop idle sampling; reuse a fresh cached baseline or run the init sweep."""
+    show_baseline_check_screen()
+    env_sampler.pause()
+    check_baseline()
+
+# -------- Page 3a - baseline check --------
+def build_baseline_check_screen(scr):
+    label = tk.Label(scr.frame, text="Checking baseline...", font=F("Arial", 32))
+    label.pack(pady=S(200))
+
+def show_baseline_check_screen():
+    switch_to("baseline_check", build_baseline_check_screen)
+
+def check_baseline():
+    """Decide whether the cached baseline still holds, asking the board for the temperature only if the cache is stale."""
+    if baseline_cache.peek() is None:
+        show_loading_screen(request_sweep("init_start"))
+        return
+
+    reading = env_cache.latest()
+    if reading is not None:
+        use_baseline(reading.temperature if reading.humidity is not None else None)
+        return
+
+    def on_temp(raw):
+        reading = read_environment(raw)
+        if reading is not None and reading[1] is not None:
+            env_cache.update(*reading)
+            use_baseline(reading[0])
+        else:
+            use_baseline(None)
 
-    for widget in root.winfo_children():
-        widget.destroy()
+    when_done(session.temp(TEMP_TIMEOUT_S), on_temp)
 
-    frame = tk.Frame(root, width=WIN_W, height=WIN_H)
-    frame.pack_propagate(False)
-    frame.pack(expand=True)
+def use_baseline(temperature):
+    global init_sweep
+    entry = baseline_cache.get(temperature)
+    if entry is not None:
+        init_sweep = entry.data
+        show_examination_screen()
+    else:
+        show_loading_screen(request_sweep("init_start"))
 
-    canvas = tk.Canvas(frame, width=WIN_W, height=WIN_H, highlightthickness=0)
+# -------- Page 3 - initial sweep / loading --------
+def build_loading_screen(scr):
+    canvas = tk.Canvas(scr.frame, width=WIN_W, height=WIN_H, highlightthickness=0)
     canvas.pack(expand=True)
 
     loading_label = tk.Label(canvas, text="Loading...", font=F("Arial", 36))
     canvas.create_window(S(240), S(200), window=loading_label)
 
-    progress = ttk.Progressbar(canvas, orient="horizontal", length=S(400), mode="determinate")
-    canvas.create_window(S(240), S(300), window=progress)
+    scr.progress = ttk.Progressbar(canvas, orient="horizontal", length=S(400), mode="determinate")
+    canvas.create_window(S(240), S(300), window=scr.progress)
+    scr.progress["maximum"] = 100
+
+    scr.plot = LivePlot(canvas, S(20), S(360), WIN_W - 2 * S(20), S(240), rows=SWEEP_ROWS)
+
+    scr.progress_job = None
+
+    def on_hide():
+        if scr.progress_job is not None:
+            root.after_cancel(scr.progress_job)
+            scr.progress_job = None
 
-    progress["maximum"] = 100
+    scr.on_hide = on_hide
+
+def show_loading_screen(future):
+    scr = switch_to("loading", build_loading_screen)
+    progress = scr.progress
+    progress["value"] = 0
     increment = 2.5
+    streaming = []  # non-empty once data flows; the bar then tracks the real transfer
+
+    def finish(sweep):
+        global init_sweep
+        init_sweep = sweep.rows  # phase1, mag1, phase2, mag2, ...; NaN for unswept channels
+        baseline_cache.store(init_sweep, sweep.temperature, sweep.humidity)
+        if sweep.humidity is not None:
+            env_cache.update(sweep.temperature, sweep.humidity)
+
+        archive.submit(np.savetxt, f"{DATA_DIR}/init_phaseAndMagnitudeData.csv", init_sweep.T, delimiter=",")
+
+        streaming.append(True)
+        progress["value"] = 100
+        show_examination_screen()
+
+    def on_progress(fraction):
+        streaming.append(True)
+        progress["value"] = 100 * fraction
 
     def update_progress(value):
-        if value <= 100:
-            progress["value"] = value
-            root.after(1000, update_progress, value + increment)
-        else:
-            def wait_and_read():
-                if ser.in_waiting < 7:
-                    root.after(50, wait_and_read)
-                    return
-
-                line1 = ser.readline().decode('utf-8').strip()
-                line2 = ser.readline().decode('utf-8').strip()
-                line3 = ser.readline().decode('utf-8').strip()
-                line4 = ser.readline().decode('utf-8').strip()
-                line5 = ser.readline().decode('utf-8').strip()
-                line6 = ser.readline().decode('utf-8').strip()
-                line7 = ser.readline().decode('utf-8').strip()  # temp & humidity
-
-                data1 = remove_nan_ovf(line1)
-                data2 = remove_nan_ovf(line2)
-                data3 = remove_nan_ovf(line3)
-                data4 = remove_nan_ovf(line4)
-                data5 = remove_nan_ovf(line5)
-                data6 = remove_nan_ovf(line6)
-                # temp_hum = line7.split("&")  # not used here
-
-                global init_phaseData1, init_phaseData2, init_phaseData3
-                global init_magnitudeData1, init_magnitudeData2, init_magnitudeData3
-
-                init_phaseData1     = np.fromstring(data1, dtype=float, sep=',')
-                init_magnitudeData1 = np.fromstring(data2, dtype=float, sep=',')
-                init_phaseData2     = np.fromstring(data3, dtype=float, sep=',')
-                init_magnitudeData2 = np.fromstring(data4, dtype=float, sep=',')
-                init_phaseData3     = np.fromstring(data5, dtype=float, sep=',')
-                init_magnitudeData3 = np.fromstring(data6, dtype=float, sep=',')
-
-                matrix1 = np.vstack([
-                    init_phaseData1, init_magnitudeData1,
-                    init_phaseData2, init_magnitudeData2,
-                    init_phaseData3, init_magnitudeData3
-                ])
-                np.savetxt("/home/raspi/internship/init_phaseAndMagnitudeData.csv", matrix1.T, delimiter=",")
-
-                show_examination_screen()
-
-            wait_and_read()
+        # estimated progress while the board is still sweeping
+        scr.progress_job = None
+        if streaming or value > 100:
+            return
+        progress["value"] = value
+        scr.progress_job = root.after(1000, update_progress, value + increment)
 
     update_progress(0)
+    stream_sweep(scr.plot, future, finish, on_progress)
 
 # -------- Page 4 - examination screen --------
-def show_examination_screen():
-    global current_screen, focused_button
-    current_screen = "examination"
-
-    for widget in root.winfo_children():
-        widget.destroy()
-
-    title = tk.Label(root, text="EXAMINATION", font=F("Arial", 36, "bold"))
+def build_examination_screen(scr):
+    title = tk.Label(scr.frame, text="EXAMINATION", font=F("Arial", 36, "bold"))
     title.pack(pady=S(40))
 
     instruction = tk.Label(
-        root,
+        scr.frame,
         text="Please put and hold the device as close to the meat as possible",
         font=F("Arial", 24, "italic"),
         wraplength=S(440),
@@ -293,235 +489,293 @@ def show_examination_screen():
     )
     instruction.pack(pady=S(40))
 
-    start_button = tk.Button(root, text="START", font=F("Arial", 28), bg=DEFAULT_BUTTON_COLOR)
+    start_button = tk.Button(scr.frame, text="START", font=F("Arial", 28), bg=DEFAULT_BUTTON_COLOR)
     start_button.pack(side="bottom", pady=S(40))
-
-    focused_button = start_button
-    update_focus(focused_button)
+    update_focus(start_button, scr)
 
     def ok_action():
-        if focused_button == start_button:
-            ser.write(b"start")
-            ser.flushInput()
-            show_countdown_screen()
+        global measurement_started
+        if scr.focus is start_button:
+            measurement_started = time.perf_counter()
+            future = request_sweep("start")
+            if MEASUREMENT_MODE == "adaptive":
+                show_adaptive_screen(future)
+            else:
+                show_countdown_screen(future)
 
-    set_active_handlers({"ok": ok_action})
+    scr.handlers = {"ok": ok_action}
+
+def show_examination_screen():
+    switch_to("examination", build_examination_screen)
 
 # -------- Page 5 - countdown --------
-def show_countdown_screen():
-    global current_screen
-    current_screen = "countdown"
+def build_countdown_screen(scr):
+    canvas = tk.Canvas(scr.frame, width=WIN_W, height=S(220), highlightthickness=0)
+    canvas.pack(side="bottom")
+    scr.plot = LivePlot(canvas, S(20), S(10), WIN_W - 2 * S(20), S(200), rows=SWEEP_ROWS)
+
+    label = tk.Label(scr.frame, text="Hold it for:", font=F("Arial", 32, "bold"))
+    label.pack(pady=S(30))
 
-    for widget in root.winfo_children():
-        widget.destroy()
+    scr.countdown_label = tk.Label(scr.frame, text="45", font=F("Arial", 96))
+    scr.countdown_label.pack(pady=S(40))
 
-    set_active_handlers({})
+    scr.timer_job = None
 
-    label = tk.Label(root, text="Hold it for:", font=F("Arial", 32, "bold"))
-    label.pack(pady=S(80))
+    def on_hide():
+        if scr.timer_job is not None:
+            root.after_cancel(scr.timer_job)
+            scr.timer_job = None
 
-    countdown_label = tk.Label(root, text="45", font=F("Arial", 96))
-    countdown_label.pack(pady=S(40))
+    scr.on_hide = on_hide
+
+def show_countdown_screen(future):
+    scr = switch_to("countdown", build_countdown_screen)
+    countdown_label = scr.countdown_label
 
     def countdown_timer(count):
+        scr.timer_job = None
         if count >= 0:
             countdown_label.config(text=str(count))
-            root.after(1000, countdown_timer, count - 1)
-        else:
-            def wait_and_read_normal():
-                if ser.in_waiting < 7:
-                    root.after(50, wait_and_read_normal)
-                    return
-
-                line11 = ser.readline().decode('utf-8').strip()
-                line22 = ser.readline().decode('utf-8').strip()
-                line33 = ser.readline().decode('utf-8').strip()
-                line44 = ser.readline().decode('utf-8').strip()
-                line55 = ser.readline().decode('utf-8').strip()
-                line66 = ser.readline().decode('utf-8').strip()
-                line77 = ser.readline().decode('utf-8').strip()
-
-                data11 = remove_nan_ovf(line11)
-                data22 = remove_nan_ovf(line22)
-                data33 = remove_nan_ovf(line33)
-                data44 = remove_nan_ovf(line44)
-                data55 = remove_nan_ovf(line55)
-                data66 = remove_nan_ovf(line66)
-                temp_hum2 = line77.split("&")
-
-                global normal_phaseData1, normal_phaseData2, normal_phaseData3
-                global normal_magnitudeData1, normal_magnitudeData2, normal_magnitudeData3
-                global tempData2, humData2
-
-                normal_phaseData1     = np.fromstring(data11, dtype=float, sep=',')
-                normal_magnitudeData1 = np.fromstring(data22, dtype=float, sep=',')
-                normal_phaseData2     = np.fromstring(data33, dtype=float, sep=',')
-                normal_magnitudeData2 = np.fromstring(data44, dtype=float, sep=',')
-                normal_phaseData3     = np.fromstring(data55, dtype=float, sep=',')
-                normal_magnitudeData3 = np.fromstring(data66, dtype=float, sep=',')
-
-                tempData2 = float(temp_hum2[0]) if temp_hum2 and temp_hum2[0] else 0.0
-                humData2  = float(temp_hum2[1]) if len(temp_hum2) > 1 and temp_hum2[1] else 0.0
-
-                matrix2 = np.vstack([
-                    normal_phaseData1, normal_magnitudeData1,
-                    normal_phaseData2, normal_magnitudeData2,
-                    normal_phaseData3, normal_magnitudeData3
-                ])
-                np.savetxt("/home/raspi/internship/normal_phaseAndMagnitudeData.csv", matrix2.T, delimiter=",")
-
-                show_new_buttons()
-
-            wait_and_read_normal()
+            scr.timer_job = root.after(1000, countdown_timer, count - 1)
 
-    countdown_timer(40)
+    def finish(sweep):
+        # the sweep is in, no need to keep holding the probe
+        global normal_sweep, tempData2, humData2
+        scr.on_hide()
 
-# -------- Page 6 - results (measurement) --------
-def show_new_buttons():
-    global current_screen, btn_back, focused_button
-    current_screen = "measurement_results_screen"
+        normal_sweep = sweep.rows
+        tempData2, humData2 = sweep_environment(sweep)
 
-    for widget in root.winfo_children():
-        widget.destroy()
+        archive.submit(np.savetxt, f"{DATA_DIR}/normal_phaseAndMagnitudeData.csv", normal_sweep.T, delimiter=",")
 
-    frame = tk.Frame(root, width=WIN_W, height=WIN_H)
-    frame.pack_propagate(False)
-    frame.pack(side="left", fill="both", expand=True)
+        show_new_buttons()
 
-    frame.grid_rowconfigure(0, weight=1)
-    frame.grid_rowconfigure(1, weight=0)
-    frame.grid_rowconfigure(2, weight=0)
-    frame.grid_rowconfigure(3, weight=0)
-    frame.grid_rowconfigure(4, weight=1)
-    frame.grid_columnconfigure(0, weight=1)
+    countdown_timer(40)
+    stream_sweep(scr.plot, future, finish)
 
-    # Filter & get peak value indexes from initial sweep
-    init_phaseData1_filtered = savgol_filter(init_phaseData1, window_length, polyorder)
-    init_phaseData2_filtered = savgol_filter(init_phaseData2, window_length, polyorder)
-    init_phaseData3_filtered = savgol_filter(init_phaseData3, window_length, polyorder)
+# -------- Page 5b - adaptive measurement --------
+def build_adaptive_screen(scr):
+    canvas = tk.Canvas(scr.frame, width=WIN_W, height=S(220), highlightthickness=0)
+    canvas.pack(side="bottom")
+    scr.plot = LivePlot(canvas, S(20), S(10), WIN_W - 2 * S(20), S(200), rows=SWEEP_ROWS)
 
-    init_phaseData1_peak_index = np.argmax(init_phaseData1_filtered)
-    init_phaseData2_peak_index = np.argmax(init_phaseData2_filtered)
-    init_phaseData3_peak_index = np.argmax(init_phaseData3_filtered)
+    label = tk.Label(scr.frame, text="Hold it...", font=F("Arial", 32, "bold"))
+    label.pack(pady=S(30))
 
-    # Filter & get peak value indexes from normal sweep
-    normal_phaseData1_filtered = savgol_filter(normal_phaseData1, window_length, polyorder)
-    normal_phaseData2_filtered = savgol_filter(normal_phaseData2, window_length, polyorder)
-    normal_phaseData3_filtered = savgol_filter(normal_phaseData3, window_length, polyorder)
+    scr.sweep_label = tk.Label(scr.frame, text="", font=F("Arial", 48))
+    scr.sweep_label.pack(pady=S(20))
 
-    normal_phaseData1_peak_index = np.argmax(normal_phaseData1_filtered)
-    normal_phaseData2_peak_index = np.argmax(normal_phaseData2_filtered)
-    normal_phaseData3_peak_index = np.argmax(normal_phaseData3_filtered)
+    scr.confidence_label = tk.Label(scr.frame, text="", font=F("Arial", 24))
+    scr.confidence_label.pack()
 
-    phase_index_diff1 = abs(init_phaseData1_peak_index - normal_phaseData1_peak_index)
-    phase_index_diff2 = abs(init_phaseData2_peak_index - normal_phaseData2_peak_index)
-    phase_index_diff3 = abs(init_phaseData3_peak_index - normal_phaseData3_peak_index)
+def show_adaptive_screen(future):
+    """Sweep repeatedly until the per-channel estimates settle, then show the mean result."""
+    scr = switch_to("adaptive", build_adaptive_screen)
+    measurement = AdaptiveMeasurement(init_sweep, feature_engine, ADAPTIVE_POLICY)
+    scr.sweep_label.config(text=f"1 / {ADAPTIVE_POLICY.max_sweeps}")
+    scr.confidence_label.config(text="")
 
-    # Magnitude min/max distance diffs
-    init_magnitudeData1_indexDiff   = filter_and_find_peaks(init_magnitudeData1,   window_length, polyorder)
-    init_magnitudeData2_indexDiff   = filter_and_find_peaks(init_magnitudeData2,   window_length, polyorder)
-    init_magnitudeData3_indexDiff   = filter_and_find_peaks(init_magnitudeData3,   window_length, polyorder)
-    normal_magnitudeData1_indexDiff = filter_and_find_peaks(normal_magnitudeData1, window_length, polyorder)
-    normal_magnitudeData2_indexDiff = filter_and_find_peaks(normal_magnitudeData2, window_length, polyorder)
-    normal_magnitudeData3_indexDiff = filter_and_find_peaks(normal_magnitudeData3, window_length, polyorder)
+    def on_sweep(sweep):
+        global normal_sweep, tempData2, humData2
+        with span("features"):
+            measurement.add(sweep.rows)
+        result = measurement.result()
+        if measurement.sweeps >= 2:
+            scr.confidence_label.config(text=f"±{result.confidence:.1f}")
 
-    magnitudeData1Result = abs(init_magnitudeData1_indexDiff - normal_magnitudeData1_indexDiff)
-    magnitudeData2Result = abs(init_magnitudeData2_indexDiff - normal_magnitudeData2_indexDiff)
-    magnitudeData3Result = abs(init_magnitudeData3_indexDiff - normal_magnitudeData3_indexDiff)
+        if not measurement.done:
+            scr.sweep_label.config(text=f"{measurement.sweeps + 1} / {ADAPTIVE_POLICY.max_sweeps}")
+            stream_sweep(scr.plot, request_sweep("start"), on_sweep)
+            return
 
-    temp_value = tempData2
-    humidity_value = humData2
+        normal_sweep = result.mean_sweep
+        tempData2, humData2 = sweep_environment(sweep)
 
-    labels_text = [
-        f"Temperature: {temp_value}°C",
-        f"Humidity: {humidity_value}%",
-        f"Quality: {phase_index_diff1, phase_index_diff2, phase_index_diff3}"
-    ]
+        archive.submit(np.savetxt, f"{DATA_DIR}/normal_phaseAndMagnitudeData.csv", normal_sweep.T, delimiter=",")
+
+        show_new_buttons(result)
+
+    stream_sweep(scr.plot, future, on_sweep)
+
+# -------- Page 6 - results (measurement) --------
+def build_results_screen(scr):
+    frame = scr.frame
+    frame.grid_rowconfigure(0, weight=1)
+    frame.grid_rowconfigure(1, weight=0)
+    frame.grid_rowconfigure(2, weight=0)
+    frame.grid_rowconfigure(3, weight=0)
+    frame.grid_rowconfigure(4, weight=0)
+    frame.grid_rowconfigure(5, weight=1)
+    frame.grid_columnconfigure(0, weight=1)
 
-    for i, text in enumerate(labels_text):
-        label = tk.Label(frame, text=text, font=F("Arial", 28), anchor="w")
+    scr.labels = []
+    for i in range(3):  # temperature, humidity, quality
+        label = tk.Label(frame, text="", font=F("Arial", 28), anchor="w")
         label.grid(row=i + 1, column=0, sticky="w", padx=S(40), pady=S(10))
+        scr.labels.append(label)
+
+    # temperature trend from the idle samples, hidden when there are too few
+    scr.drift_label = tk.Label(frame, text="", font=F("Arial", 20), anchor="w")
+    scr.drift_label.grid(row=4, column=0, sticky="w", padx=S(40), pady=S(10))
 
     btn_back = tk.Button(frame, text="BACK", font=F("Arial", 28), command=home_screen, bg=DEFAULT_BUTTON_COLOR)
-    btn_back.grid(row=5, column=0, sticky="se", padx=S(16), pady=S(16))
-    update_focus(btn_back)
+    btn_back.grid(row=6, column=0, sticky="se", padx=S(16), pady=S(16))
+    update_focus(btn_back, scr)
 
     def focus_left():
         update_focus(btn_back)
 
     def ok_action():
-        if focused_button == btn_back:
+        if scr.focus is btn_back:
             home_screen()
 
-    set_active_handlers({"left": focus_left, "ok": ok_action})
+    scr.handlers = {"left": focus_left, "ok": ok_action}
 
-# ======== NEW: Temperature flow ========
+def show_new_buttons(adaptive_result=None):
+    scr = switch_to("measurement_results_screen", build_results_screen)
 
-def parse_temperature_line(line: str):
-    """
-    Accepts either '25.4' or '25.4&40.2'.
-    Returns (temp_float, hum_float or None).
-    """
-    try:
-        parts = [p.strip() for p in line.split("&")]
-        if len(parts) == 1:
-            t = float(parts[0]) if parts[0] else 0.0
-            return t, None
-        elif len(parts) >= 2:
-            t = float(parts[0]) if parts[0] else 0.0
-            h = float(parts[1]) if parts[1] else None
-            return t, h
-    except Exception:
-        pass
-    return 0.0, None
-
-def show_temperature_loading():
-    """Screen shown right after sending b'temp'."""
-    global current_screen
-    current_screen = "temperature_loading"
+    # one filter pass for both sweeps gives the score and the phase peak shifts (bins) for the archive
+    with span("scoring"):
+        score = scoring_engine.score_pair(init_sweep, normal_sweep)
+    features = adaptive_result if adaptive_result is not None else score.features
+    archive.append(init_sweep, normal_sweep, tempData2, humData2, score.score, features.phase_shift)
+    env_missing = not (tempData2 or humData2)  # sweep_environment's 0.0/0.0: no reading
+    history.append(score.score, None if env_missing else tempData2, None if env_missing else humData2,
+                   score.init_hz, score.normal_hz)
+    quality_text = f"Quality: {float(score.score):.1f}"
+    if adaptive_result is not None:
+        # the interval is on the peak position, not on the (calibrated, unitless) score
+        quality_text += f"\nPeak: ±{adaptive_result.confidence * STEP_SIZE:.1f} Hz"
 
-    for widget in root.winfo_children():
-        widget.destroy()
+    temp_value = tempData2
+    humidity_value = humData2
+
+    labels_text = [
+        f"Temperature: {temp_value}°C",
+        f"Humidity: {humidity_value}%",
+        quality_text
+    ]
 
-    set_active_handlers({})
+    for label, text in zip(scr.labels, labels_text):
+        label.config(text=text)
+
+    if not env_missing:
+        env_cache.update(tempData2, humData2)
+    drift = env_cache.drift()
+    if drift is not None:
+        scr.drift_label.config(text=f"Drift: {drift:+.2f}°C/min")
+        scr.drift_label.grid()
+    else:
+        scr.drift_label.grid_remove()
+
+    if measurement_started is not None:
+        recorder.record("measurement", time.perf_counter() - measurement_started)
+    if TIMING_LOG:
+        archive.submit(recorder.flush, TIMING_LOG)
+
+# -------- Hidden - timing diagnostics --------
+def build_diagnostics_screen(scr):
+    title = tk.Label(scr.frame, text="DIAGNOSTICS", font=F("Arial", 28, "bold"))
+    title.pack(pady=S(20))
+
+    scr.table = tk.Label(scr.frame, text="", font=F("Courier", 14), justify="left", anchor="nw")
+    scr.table.pack(fill=BOTH, expand=True, padx=S(16))
+
+    btn_back = tk.Button(scr.frame, text="BACK", font=F("Arial", 28), bg=DEFAULT_BUTTON_COLOR)
+    btn_back.pack(side="bottom", anchor="e", padx=S(16), pady=S(16))
+    update_focus(btn_back, scr)
+
+    scr.refresh_job = None
+
+    def on_hide():
+        if scr.refresh_job is not None:
+            root.after_cancel(scr.refresh_job)
+            scr.refresh_job = None
+
+    scr.on_hide = on_hide
+    scr.handlers = {"ok": home_screen, "left": home_screen}
+
+def show_diagnostics_screen():
+    """Per-stage timing percentiles (ms) of the recent spans, refreshed every second."""
+    scr = switch_to("diagnostics", build_diagnostics_screen)
+
+    def refresh():
+        lines = [f"{'stage':15s}{'n':>5s}{'p50':>8s}{'p95':>8s}{'max':>8s}"]
+        for name, (n, worst, p50, p95) in sorted(recorder.percentiles((50, 95)).items()):
+            lines.append(f"{name[:15]:15s}{n:5d}{p50:8.1f}{p95:8.1f}{worst:8.1f}")
+        if archive.failures:
+            lines.append(f"archive write failures: {archive.failures}")
+        scr.table.config(text="\n".join(lines))
+        scr.refresh_job = root.after(1000, refresh)
+
+    refresh()
+
+# -------- Page 7 - quality trend --------
+def build_trend_screen(scr):
+    title = tk.Label(scr.frame, text="TREND", font=F("Arial", 28, "bold"))
+    title.pack(pady=S(16))
+
+    canvas = tk.Canvas(scr.frame, width=WIN_W, height=S(300), highlightthickness=0)
+    canvas.pack()
+    scr.plot = TrendPlot(canvas, S(20), S(10), WIN_W - 2 * S(20), S(280), font=F("Arial", 14))
+
+    scr.summary = tk.Label(scr.frame, text="", font=F("Arial", 20), justify="left", anchor="w")
+    scr.summary.pack(fill="x", padx=S(40), pady=S(10))
+
+    btn_back = tk.Button(scr.frame, text="BACK", font=F("Arial", 28), command=home_screen, bg=DEFAULT_BUTTON_COLOR)
+    btn_back.pack(side="bottom", anchor="e", padx=S(16), pady=S(16))
+    update_focus(btn_back, scr)
+
+    scr.handlers = {"ok": home_screen, "left": home_screen}
+
+def show_trend_screen():
+    """Quality (blue) and temperature (red) of the measurements kept in ``history``."""
+    scr = switch_to("trend", build_trend_screen)
+    view = history.view()
+    scr.plot.update(view)
+    if not len(view.quality):
+        scr.summary.config(text="No measurements yet")
+        return
+    lines = [f"{len(view.quality)} measurements, last {float(view.quality[-1]):.1f}"]
+    slope = history.slope()
+    if slope is not None:
+        lines.append(f"Trend: {slope:+.2f} / h")
+    scr.summary.config(text="\n".join(lines))
 
-    frame = tk.Frame(root, width=WIN_W, height=WIN_H)
-    frame.pack_propagate(False)
-    frame.pack(expand=True)
+# ======== NEW: Temperature flow ========
 
-    canvas = tk.Canvas(frame, width=WIN_W, height=WIN_H, highlightthickness=0)
+def build_temperature_loading_screen(scr):
+    canvas = tk.Canvas(scr.frame, width=WIN_W, height=WIN_H, highlightthickness=0)
     canvas.pack(expand=True)
 
     label = tk.Label(canvas, text="Getting temperature...", font=F("Arial", 32))
     canvas.create_window(S(240), S(200), window=label)
 
-    spinner = ttk.Progressbar(canvas, orient="horizontal", length=S(400), mode="indeterminate")
-    canvas.create_window(S(240), S(280), window=spinner)
-    spinner.start(10)
-
-    # poll serial until a line arrives
-    def poll_for_temp():
-        if ser.in_waiting > 0:
-            raw = ser.readline().decode("utf-8").strip()
-            t, h = parse_temperature_line(raw)
-            show_temperature_result_screen(t, h)
-        else:
-            root.after(50, poll_for_temp)
+    scr.spinner = ttk.Progressbar(canvas, orient="horizontal", length=S(400), mode="indeterminate")
+    canvas.create_window(S(240), S(280), window=scr.spinner)
+    scr.on_hide = scr.spinner.stop
 
-    poll_for_temp()
+def show_temperature():
+    """Show the cached reading right away; wait for the sampler only if it is stale."""
+    reading = env_cache.latest()
+    if reading is not None:
+        show_temperature_result_screen(reading.temperature, reading.humidity)
+    else:
+        show_temperature_loading(env_sampler.request_now())
 
-def show_temperature_result_screen(temp_value: float, humidity_value=None):
-    """Result page with BACK button (same focus/OK behavior)."""
-    global current_screen, focused_button
-    current_screen = "temperature_result"
+def show_temperature_loading(future):
+    """Screen shown while the sampler fetches a fresh reading; a failed request goes to device_error."""
+    scr = switch_to("temperature_loading", build_temperature_loading_screen)
+    scr.spinner.start(10)
 
-    for widget in root.winfo_children():
-        widget.destroy()
+    def on_temp(line):
+        show_temperature_result_screen(*(read_environment(line) or (None, None)))
 
-    frame = tk.Frame(root, width=WIN_W, height=WIN_H)
-    frame.pack_propagate(False)
-    frame.pack(side="left", fill="both", expand=True)
+    when_done(future, on_temp)
 
+def build_temperature_result_screen(scr):
+    frame = scr.frame
     frame.grid_rowconfigure(0, weight=1)
     frame.grid_rowconfigure(1, weight=0)
     frame.grid_rowconfigure(2, weight=0)
@@ -531,35 +785,61 @@ def show_temperature_result_screen(temp_value: float, humidity_value=None):
     title = tk.Label(frame, text="TEMPERATURE", font=F("Arial", 36, "bold"))
     title.grid(row=0, column=0, padx=S(40), pady=S(20), sticky="w")
 
-    lines = [f"Temperature: {temp_value:.2f}°C"]
-    if humidity_value is not None:
-        lines.append(f"Humidity: {humidity_value:.2f}%")
-
-    for i, text in enumerate(lines, start=1):
-        lbl = tk.Label(frame, text=text, font=F("Arial", 28), anchor="w")
-        lbl.grid(row=i, column=0, sticky="w", padx=S(40), pady=S(10))
+    scr.temp_label = tk.Label(frame, text="", font=F("Arial", 28), anchor="w")
+    scr.temp_label.grid(row=1, column=0, sticky="w", padx=S(40), pady=S(10))
+    scr.hum_label = tk.Label(frame, text="", font=F("Arial", 28), anchor="w")
+    scr.hum_label.grid(row=2, column=0, sticky="w", padx=S(40), pady=S(10))
 
     btn_back = tk.Button(frame, text="BACK", font=F("Arial", 28), command=home_screen, bg=DEFAULT_BUTTON_COLOR)
     btn_back.grid(row=3, column=0, sticky="se", padx=S(16), pady=S(16))
-    update_focus(btn_back)
+    update_focus(btn_back, scr)
 
     def focus_left():
         update_focus(btn_back)
 
     def ok_action():
-        if focused_button == btn_back:
+        if scr.focus is btn_back:
             home_screen()
 
-    set_active_handlers({"left": focus_left, "ok": ok_action})
+    scr.handlers = {"left": focus_left, "ok": ok_action}
+
+def show_temperature_result_screen(temp_value=None, humidity_value=None):
+    """Result page with BACK button (same focus/OK behavior); ``temp_value`` None when the sensor gave no reading."""
+    scr = switch_to("temperature_result", build_temperature_result_screen)
+
+    if temp_value is None:
+        scr.temp_label.config(text="Temperature: no reading")
+    else:
+        scr.temp_label.config(text=f"Temperature: {temp_value:.2f}°C")
+    if humidity_value is not None:
+        scr.hum_label.config(text=f"Humidity: {humidity_value:.2f}%")
+        scr.hum_label.grid()
+    else:
+        scr.hum_label.grid_remove()
 
 # -------------------- App start/stop --------------------
-show_circle_with_text()
-poll_buttons()
+def main():
+    global root, archive, screens
+    archive = MeasurementArchive(f"{DATA_DIR}/archive", rows=SWEEP_ROWS)
+
+    root = tk.Tk()
+    root.geometry(f"{W}x{H}+{X}+{Y}")
+    screens = ScreenManager(root, WIN_W, WIN_H)
+
+    start_buttons()
+    show_circle_with_text()
 
-try:
-    root.mainloop()
-finally:
     try:
-        lgpio.gpiochip_close(chip)
-    except Exception:
-        pass
+        root.mainloop()
+    finally:
+        if session is not None:
+            session.close()
+        if reader is not None:
+            reader.stop()
+        archive.close()
+        input_backend.close()
+        if TIMING_LOG:
+            recorder.flush(TIMING_LOG)
+
+if __name__ == "__main__":
+    main()
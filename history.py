@@ -0,0 +1,63 @@
+"""In-memory history of the last measurements, for the trend screen.
+
+A fixed-capacity ring buffer: every field is one array preallocated at
+start-up and overwritten in place, so recording a measurement allocates
+nothing and the oldest one simply drops out once the buffer is full.
+Values are float32 except the timestamps, which need float64 to keep
+second resolution on time.time() values.
+
+``view`` returns the buffered measurements oldest first (a copy, cheap at
+this size), ready to plot.
+"""
+
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+
+class HistoryView(NamedTuple):
+    timestamp: np.ndarray    # (n,) time.time() of each measurement
+    quality: np.ndarray      # (n,) calibrated score
+    temperature: np.ndarray  # (n,) °C, NaN when the env line was missing
+    humidity: np.ndarray     # (n,) %
+    peaks: np.ndarray        # (n, 2, channels) filtered phase peak in Hz, [init, normal]
+
+
+class MeasurementHistory:
+    def __init__(self, capacity=256, channels=3):
+        self.capacity = capacity
+        self._timestamp = np.zeros(capacity)
+        self._quality = np.zeros(capacity, dtype=np.float32)
+        self._temperature = np.zeros(capacity, dtype=np.float32)
+        self._humidity = np.zeros(capacity, dtype=np.float32)
+        self._peaks = np.zeros((capacity, 2, channels), dtype=np.float32)
+        self._count = 0  # measurements ever recorded
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def append(self, quality, temperature, humidity, init_hz, normal_hz, timestamp=None):
+        i = self._count % self.capacity
+        self._timestamp[i] = time.time() if timestamp is None else timestamp
+        self._quality[i] = quality
+        self._temperature[i] = np.nan if temperature is None else temperature
+        self._humidity[i] = np.nan if humidity is None else humidity
+        self._peaks[i, 0] = init_hz
+        self._peaks[i, 1] = normal_hz
+        self._count += 1
+
+    def view(self, last=None) -> HistoryView:
+        """The ``last`` (default: all) buffered measurements, oldest first."""
+        n = len(self) if last is None else min(last, len(self))
+        idx = np.arange(self._count - n, self._count) % self.capacity
+        return HistoryView(self._timestamp[idx], self._quality[idx], self._temperature[idx],
+                           self._humidity[idx], self._peaks[idx])
+
+    def slope(self, last=None):
+        """Least-squares quality trend in score units per hour, or None with fewer than 3 measurements."""
+        v = self.view(last)
+        if v.quality.size < 3 or np.ptp(v.timestamp) <= 0:
+            return None
+        hours = (v.timestamp - v.timestamp[0]) / 3600.0
+        return float(np.polyfit(hours, v.quality.astype(np.float64), 1)[0])
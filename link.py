@@ -0,0 +1,67 @@
+"""Link-rate negotiation and throughput probe, run once at connect time.
+
+The firmware boots at BOOT_RATE. ``negotiate_rate`` offers faster rates,
+highest first: the board answers ``baud <rate>`` at the old rate, both
+sides switch, and the host confirms with ``ping``/``pong`` at the new one.
+A board that hears no ``ping`` within two seconds falls back on its own, so
+a rate the cable cannot carry costs one timeout and the next is tried.
+Native-USB boards ignore the rate; the probe then shows the USB speed.
+
+``measure_throughput`` times a ``probe <n>`` burst (n filler bytes plus a
+line end). The time includes the command round trip, so it slightly
+understates the raw link rate.
+"""
+
+import queue
+import time
+
+BOOT_RATE = 115200                 # Serial.begin() in the firmware
+RATES = (1000000, 500000, 230400)  # offered in this order
+REVERT_TIMEOUT_S = 2.0             # BAUD_CONFIRM_TIMEOUT in the firmware
+
+
+def _expect(reader, predicate, timeout):
+    """First text event matching ``predicate`` within ``timeout`` s, else None."""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        try:
+            kind, payload = reader.events.get(timeout=remaining)
+        except queue.Empty:
+            return None
+        if kind == "text" and predicate(payload):
+            return payload
+
+
+def negotiate_rate(ser, reader, rates=RATES, timeout=1.0):
+    """Switch ``ser`` and the board to the fastest rate in ``rates`` that works; returns the rate in use."""
+    current = ser.baudrate
+    for rate in rates:
+        if rate <= current:
+            continue
+        reader.discard_pending()
+        ser.write(f"baud {rate}\n".encode())
+        if _expect(reader, lambda text: text == f"baud {rate}", timeout) is None:
+            break  # firmware without rate switching
+        time.sleep(0.02)  # let the board reopen its port
+        ser.baudrate = rate
+        reader.resync()
+        ser.write(b"ping\n")
+        if _expect(reader, lambda text: text == "pong", timeout) is not None:
+            return rate
+        ser.baudrate = current
+        reader.resync()
+        time.sleep(REVERT_TIMEOUT_S)  # the board returns to the old rate by itself
+    return current
+
+
+def measure_throughput(ser, reader, size=12000, timeout=5.0):
+    """Achieved bytes/s for a ``size`` byte burst from the board, or None."""
+    reader.discard_pending()
+    t0 = time.perf_counter()
+    ser.write(f"probe {size}\n".encode())
+    if _expect(reader, lambda text: len(text) >= size, timeout) is None:
+        return None
+    return size / (time.perf_counter() - t0)
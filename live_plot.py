@@ -0,0 +1,85 @@
+"""Live sweep plot on a Tk canvas, fed while the rows are still arriving.
+
+The 501 points of a row are reduced to one min/max pair per pixel column,
+so a row is at most 2 x width canvas coordinates however long the sweep.
+Each channel gets a horizontal band with phase and magnitude overlaid and
+scaled independently. Canvas items are created once and only their
+coordinates change.
+"""
+
+import numpy as np
+
+from timing import span
+
+PHASE_COLOR = "#1f77b4"
+MAGNITUDE_COLOR = "#d62728"
+
+
+class LivePlot:
+    def __init__(self, canvas, x, y, width, height, rows=6, points=501):
+        self.canvas = canvas
+        self.x = x
+        self.y = y
+        self.width = width
+        self.rows = rows
+        self.points = points
+        self.band_height = height / (rows // 2)
+        # pixel column of every sample, and x of every column
+        self._columns = (np.arange(points) * width) // points
+        self._xs = x + np.arange(width) + 0.5
+        self._min = np.full((rows, width), np.nan)
+        self._max = np.full((rows, width), np.nan)
+        self._dirty = set()
+
+        self._items = []
+        for row in range(rows):
+            color = PHASE_COLOR if row % 2 == 0 else MAGNITUDE_COLOR
+            self._items.append(canvas.create_line(0, 0, 0, 0, fill=color, width=1, state="hidden"))
+        for band in range(1, rows // 2):
+            by = y + band * self.band_height
+            canvas.create_line(x, by, x + width, by, fill="#c0c0c0")
+
+    def reset(self):
+        self._min.fill(np.nan)
+        self._max.fill(np.nan)
+        self._dirty.clear()
+        for item in self._items:
+            self.canvas.itemconfigure(item, state="hidden")
+
+    def add(self, row, start, values):
+        """Record raw values ``values`` of ``row`` starting at sample ``start``."""
+        values = np.asarray(values, dtype=float)[:max(0, self.points - start)]
+        if row >= self.rows or not values.size:
+            return
+        cols = self._columns[start:start + values.size]
+        np.fmin.at(self._min[row], cols, values)  # fmin/fmax skip NaN (ovf) points
+        np.fmax.at(self._max[row], cols, values)
+        self._dirty.add(row)
+
+    def add_sweep(self, data):
+        for row in range(min(self.rows, len(data))):
+            self.add(row, 0, data[row])
+
+    def redraw(self):
+        """Move the changed lines; call at most once per Tk update."""
+        if self._dirty:
+            with span("plot_redraw"):
+                self._redraw()
+
+    def _redraw(self):
+        for row in self._dirty:
+            lo, hi = self._min[row], self._max[row]
+            filled = ~np.isnan(lo)
+            if filled.sum() < 2:
+                continue
+            vmin, vmax = lo[filled].min(), hi[filled].max()
+            scale = (self.band_height - 4) / (vmax - vmin) if vmax > vmin else 0.0
+            bottom = self.y + (row // 2 + 1) * self.band_height - 2
+            xs = np.repeat(self._xs[filled], 2)
+            ys = np.empty_like(xs)
+            ys[0::2] = bottom - (lo[filled] - vmin) * scale
+            ys[1::2] = bottom - (hi[filled] - vmin) * scale
+            coords = np.column_stack([xs, ys]).ravel().tolist()
+            self.canvas.coords(self._items[row], coords)
+            self.canvas.itemconfigure(self._items[row], state="normal")
+        self._dirty.clear()
@@ -0,0 +1,95 @@
+"""Re-score saved measurements without the device or the GUI.
+
+Walks a directory for ``*init_phaseAndMagnitudeData.csv`` files, pairs each
+with the ``normal_`` file next to it, and prints one CSV line of quality
+values per pair. Pairs are scored in parallel across a process pool.
+
+    python reprocess.py /home/raspi/internship/samples -o scores.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis import POLYORDER, WINDOW_LENGTH, load_sweep_csv
+from scoring import METHODS, Calibration, ScoringEngine
+
+INIT_SUFFIX = "init_phaseAndMagnitudeData.csv"
+NORMAL_SUFFIX = "normal_phaseAndMagnitudeData.csv"
+
+
+def find_pairs(directory):
+    pairs = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()  # walk in name order so the output can be diffed
+        for name in sorted(filenames):
+            if not name.endswith(INIT_SUFFIX):
+                continue
+            normal = os.path.join(dirpath, name[:-len(INIT_SUFFIX)] + NORMAL_SUFFIX)
+            if os.path.exists(normal):
+                pairs.append((os.path.join(dirpath, name), normal))
+    return pairs
+
+
+def score_pair(job):
+    init_path, normal_path, window_length, polyorder, calibration, method = job
+    try:
+        init, normal = load_sweep_csv(init_path), load_sweep_csv(normal_path)
+        score = ScoringEngine(window_length=window_length, polyorder=polyorder,
+                              calibration=calibration, method=method).score_pair(init, normal)
+        features = score.features  # same filter pass as the score
+    except (OSError, ValueError) as exc:
+        return init_path, None, None, str(exc)
+    return init_path, features, score, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("-o", "--output", help="CSV file to write (default: stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--window-length", type=int, default=WINDOW_LENGTH)
+    parser.add_argument("--polyorder", type=int, default=POLYORDER)
+    parser.add_argument("--calibration", help="JSON shift -> score table (default: score = mean shift in Hz)")
+    parser.add_argument("--method", choices=METHODS, default="peak", help="init -> normal shift estimator")
+    args = parser.parse_args(argv)
+
+    calibration = Calibration.load(args.calibration) if args.calibration else Calibration()
+    pairs = find_pairs(args.directory)
+    jobs = [(i, n, args.window_length, args.polyorder, calibration, args.method) for i, n in pairs]
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    failed = 0
+    try:
+        writer = csv.writer(out)
+        writer.writerow(["sample", "score", "shift_hz", "phase_shift", "mag_span_diff",
+                         "init_peaks", "normal_peaks"])
+        workers = args.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(jobs) // (4 * workers))
+            for path, features, score, error in pool.map(score_pair, jobs, chunksize=chunksize):
+                if error:
+                    failed += 1
+                    print(f"{path}: {error}", file=sys.stderr)
+                    continue
+                sample = os.path.relpath(path, args.directory)[:-len(INIT_SUFFIX)] or "."
+                writer.writerow([
+                    sample,
+                    f"{float(score.score):.3f}",
+                    " ".join(f"{v:.3f}" for v in score.shift_hz),
+                    " ".join(str(int(v)) for v in features.phase_shift),
+                    " ".join(str(int(v)) for v in features.mag_span_diff),
+                    " ".join(str(int(v)) for v in features.init_peaks),
+                    " ".join(str(int(v)) for v in features.normal_peaks),
+                ])
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"scored {len(jobs) - failed} of {len(jobs)} samples", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Vectorized decoding of the comma separated sweep rows.
+
+Arduino's Serial.print(float) writes "nan", "ovf" or "inf" for values it
+cannot format. Those points are flagged in a validity mask and filled by
+linear interpolation from their valid neighbours, so they do not show up as
+spikes in the Savitzky-Golay filtered curves.
+"""
+
+import numpy as np
+
+_INVALID_TOKENS = (b"ovf", b"inf")  # "-inf" becomes "-nan"
+
+
+def parse_row(line, points=None):
+    """Tokenize one row into ``(values, valid)``.
+
+    ``line`` may be bytes or str, with or without the trailing comma the
+    firmware prints. Unparseable tokens are NaN in ``values`` and False in
+    ``valid``. With ``points`` the result is cut or NaN-padded to that length.
+    """
+    if isinstance(line, str):
+        line = line.encode()
+    line = line.strip().rstrip(b",")
+    for token in _INVALID_TOKENS:
+        line = line.replace(token, b"nan")
+    try:
+        # numpy's C text parser, one pass over the whole row
+        values = np.loadtxt([line], delimiter=",", ndmin=1, encoding="latin-1") if line else np.empty(0)
+    except ValueError:
+        # garbage in the row (e.g. a line break lost on the wire), go token by token
+        values = np.array([_to_float(t) for t in line.split(b",")], dtype=np.float64)
+    if points is not None and values.size != points:
+        padded = np.full(points, np.nan)
+        n = min(points, values.size)
+        padded[:n] = values[:n]
+        values = padded
+    return values, np.isfinite(values)
+
+
+def _to_float(token: bytes) -> float:
+    try:
+        return float(token)
+    except ValueError:
+        return np.nan
+
+
+def fill_invalid(values, valid):
+    """Replace invalid points by linear interpolation along the last axis.
+
+    Works on one row or a stack of rows, in place. Rows without a single
+    valid point are zeroed.
+    """
+    rows = values.reshape(-1, values.shape[-1])
+    masks = valid.reshape(-1, valid.shape[-1])
+    x = np.arange(rows.shape[-1])
+    for row, mask in zip(rows, masks):
+        if mask.all():
+            continue
+        if not mask.any():
+            row[:] = 0.0
+            continue
+        row[~mask] = np.interp(x[~mask], x[mask], row[mask])
+    return values
+
+
+def sanitize_row(line, points=None):
+    """``parse_row`` followed by ``fill_invalid``."""
+    values, valid = parse_row(line, points)
+    return fill_invalid(values, valid), valid
@@ -0,0 +1,128 @@
+"""Frequency-calibrated quality score.
+
+The raw quality is a per-channel difference of argmax indices. The
+ScoringEngine turns it into physical units and a single number:
+
+1. each channel's frequency axis (start + i * step, as swept by the
+   firmware) is computed once per engine;
+2. the filtered phase peak is refined to sub-bin precision by fitting a
+   parabola through the maximum and its two neighbours;
+3. init -> normal peak shifts are expressed in Hz;
+4. the weighted mean absolute shift is mapped through a piecewise-linear
+   calibration table to the score.
+
+Channels with non-finite data (not swept, see sweep_model) are left out of
+the mean; their shift is NaN.
+
+``method="xcorr"`` replaces step 3 with the FFT cross-correlation of the
+whole filtered curves (shift.py), which also yields a correlation strength
+and the magnitude shifts.
+
+Everything works on stacks shaped (..., 2, rows, points), so one live
+measurement and a whole archive session are scored by the same call.
+"""
+
+import json
+from typing import NamedTuple
+
+import numpy as np
+
+from features import FeatureEngine, SweepFeatures, parabolic_peak
+from shift import xcorr_shift
+
+# the one copy of the firmware's sweep setup; the GUI, emulator and batch tools import it
+START_FREQUENCIES = (16900, 17235, 17330)  # START_FREQUENCY1..3 in the firmware
+STEP_SIZE = 1.0                            # Hz, STEP_SIZE in the firmware
+NUM_INCREMENTS = 501
+
+METHODS = ("peak", "xcorr")
+
+
+class Calibration(NamedTuple):
+    """Piecewise-linear map from mean |shift| in Hz to the score, plus per-channel weights."""
+    shift_hz: tuple = (0.0, 1000.0)
+    score: tuple = (0.0, 1000.0)   # uncalibrated: the score is the mean shift in Hz
+    weights: tuple = ()            # empty: all channels count equally
+
+    @classmethod
+    def load(cls, path):
+        """Read ``{"shift_hz": [...], "score": [...], "weights": [...]}`` from a JSON file."""
+        with open(path) as f:
+            table = json.load(f)
+        calibration = cls(tuple(table["shift_hz"]), tuple(table["score"]), tuple(table.get("weights", ())))
+        if len(calibration.shift_hz) != len(calibration.score) or len(calibration.shift_hz) < 2:
+            raise ValueError(f"{path}: shift_hz and score need the same length, at least 2")
+        if np.any(np.diff(calibration.shift_hz) <= 0):
+            raise ValueError(f"{path}: shift_hz must be increasing")
+        return calibration
+
+
+class Score(NamedTuple):
+    init_hz: np.ndarray     # (..., channels) sub-bin phase peak frequency of the init sweep
+    normal_hz: np.ndarray
+    shift_hz: np.ndarray    # normal - init, signed
+    score: np.ndarray       # (...,) calibrated score
+    strength: np.ndarray = None      # xcorr only: (..., channels) phase correlation at the shift
+    mag_shift_hz: np.ndarray = None  # xcorr only: (..., channels) magnitude shift
+    features: SweepFeatures = None   # argmax bin features of the same filtered stack
+
+
+class ScoringEngine:
+    def __init__(self, start_frequencies=START_FREQUENCIES, step=STEP_SIZE, points=NUM_INCREMENTS,
+                 window_length=31, polyorder=3, calibration=Calibration(), method="peak", max_lag=None):
+        if method not in METHODS:
+            raise ValueError(f"unknown shift method {method!r}, expected one of {METHODS}")
+        self.features = FeatureEngine(window_length, polyorder)
+        self.method = method
+        self.max_lag = max_lag  # xcorr search range in samples; None: the whole sweep
+        self.start_frequencies = np.asarray(start_frequencies, dtype=np.float64)
+        self.step = step
+        self.points = points
+        self.calibration = calibration
+        self.frequencies = self.start_frequencies[:, None] + np.arange(points) * step
+        self.frequencies.setflags(write=False)
+        channels = len(start_frequencies)
+        weights = np.asarray(calibration.weights or np.ones(channels), dtype=np.float64)
+        if weights.shape != (channels,):
+            raise ValueError(f"{weights.size} calibration weights for {channels} channels")
+        self._weights = weights / weights.sum()
+
+    def peak_hz(self, phase):
+        """Sub-bin peak frequency of filtered phase rows shaped (..., channels, points)."""
+        return self.start_frequencies + parabolic_peak(phase) * self.step
+
+    def score(self, stack) -> Score:
+        """Score one (2, rows, points) [init, normal] stack or a batch of them."""
+        stack = np.asarray(stack)
+        if stack.shape[-1] != self.points or stack.shape[-2] != 2 * len(self.start_frequencies):
+            raise ValueError(f"expected (..., 2, {2 * len(self.start_frequencies)}, {self.points}), "
+                             f"got {stack.shape}")
+        filtered = self.features.filter(stack)
+        strength = mag_shift = None
+        if self.method == "xcorr":
+            init_hz = self.peak_hz(filtered[..., 0, 0::2, :])
+            estimate = xcorr_shift(filtered[..., 0, :, :], filtered[..., 1, :, :], self.max_lag)
+            shift = estimate.shift[..., 0::2] * self.step
+            mag_shift = estimate.shift[..., 1::2] * self.step
+            strength = estimate.strength[..., 0::2]
+            normal_hz = init_hz + shift
+        else:
+            peaks = self.peak_hz(filtered[..., 0::2, :])
+            init_hz, normal_hz = peaks[..., 0, :], peaks[..., 1, :]
+            shift = normal_hz - init_hz
+        swept = np.isfinite(stack[..., 0::2, :]).all(axis=-1).all(axis=-2)  # (..., channels)
+        shift = np.where(swept, shift, np.nan)
+        init_hz, normal_hz = np.where(swept, init_hz, np.nan), np.where(swept, normal_hz, np.nan)
+        weights = np.where(swept, self._weights, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_shift = np.where(swept, np.abs(shift), 0.0) @ self._weights / weights.sum(axis=-1)
+        score = np.interp(mean_shift, self.calibration.shift_hz, self.calibration.score)
+        return Score(init_hz, normal_hz, shift, score, strength, mag_shift, self.features.from_filtered(filtered))
+
+    def score_pair(self, init, normal) -> Score:
+        """Score one measurement given its (rows, points) init and normal sweeps."""
+        return self.score(np.stack([init, normal]))
+
+    def score_records(self, records) -> Score:
+        """Score archive records (archive.record_dtype) in one call."""
+        return self.score(np.stack([records["init"], records["normal"]], axis=-3))
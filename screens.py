@@ -0,0 +1,49 @@
+"""Cached screens for the Tk GUI.
+
+Each screen's frame is built once, the first time it is shown, and stacked
+on the root window. Switching screens only raises the frame, so after
+warm-up a transition creates no widgets or fonts; the caller just updates
+the screen's dynamic labels.
+"""
+
+import tkinter as tk
+
+from timing import span
+
+
+class Screen:
+    """One cached screen: its frame, the widgets its builder keeps, and its own focus."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.focus = None        # focused button, kept while other screens are shown
+        self.handlers = {}       # button name -> callable, set by the builder
+        self.on_hide = None      # called when another screen is raised
+
+
+class ScreenManager:
+    def __init__(self, root, width, height):
+        self.root = root
+        self.width = width
+        self.height = height
+        self.current = None
+        self._screens = {}
+
+    def show(self, name, build):
+        """Raise screen ``name``, calling ``build(screen)`` the first time."""
+        screen = self._screens.get(name)
+        if screen is None:
+            with span("screen_build"):
+                frame = tk.Frame(self.root, width=self.width, height=self.height)
+                frame.pack_propagate(False)
+                frame.grid_propagate(False)
+                frame.place(x=0, y=0, relwidth=1, relheight=1)
+                screen = Screen(frame)
+                build(screen)
+            self._screens[name] = screen
+        if screen is not self.current:
+            if self.current is not None and self.current.on_hide:
+                self.current.on_hide()
+            screen.frame.tkraise()
+            self.current = screen
+        return screen
@@ -0,0 +1,158 @@
+"""Session layer that owns the serial link once the board is up.
+
+Commands are queued and sent one at a time by a worker thread, so a
+``temp`` request can no longer land in the middle of a sweep response.
+Commands are newline-terminated and spaced by ``settle_s``; firmware that
+still ends commands on a quiet period (Serial.readString()) needs
+``settle_s`` above its 1 s timeout. Each command
+waits for its own kind of answer (``sweep`` or ``env``) under two deadlines:
+``timeout`` until the board starts answering and ``idle_timeout`` between
+bytes after that. The board says nothing while it sweeps, so a sweep's
+``timeout`` has to cover the whole sweep.
+
+On a missed deadline the reader drops its partial line or frame. If
+ASCII rows of the answer had already arrived, the rest of it is still on
+its way: it would parse as a short sweep and is thrown away when it
+arrives rather than handed to the next command. That late answer is
+owed for the failed command's ``timeout`` at most, in case the board
+reset or gave up. An answer that never started is not owed (the board
+may have dropped the command), nor is a frame that failed its CRC or the
+rest of a binary frame, which the board aborts once acks stop. A resent
+command takes whichever of its answers comes first. Sweep commands are
+not resent by default: the board would sweep twice, and in the middle of
+a binary frame it reads the command bytes as acknowledgements.
+
+Callers get a ``concurrent.futures.Future``. Events that are not the
+answer itself (live ``partial`` rows, ``text``) are forwarded to
+``session.events`` for the UI to drain.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple
+
+
+_CORRUPT = object()  # _await: a frame arrived but failed to decode
+_CUT_OFF = object()  # _await: the deadline passed after part of the answer arrived
+
+
+class SessionError(Exception):
+    """The command failed: no answer within its deadlines, or the link is gone."""
+
+
+class Command(NamedTuple):
+    payload: bytes
+    expect: str             # event kind that answers it: "sweep" or "env"
+    timeout: float          # seconds until the first byte of the answer
+    idle_timeout: float     # seconds of silence allowed once the answer is flowing
+    retries: int
+
+
+class SerialSession(threading.Thread):
+    def __init__(self, ser, reader, settle_s=0.05):
+        super().__init__(name="serial-session", daemon=True)
+        self.ser = ser
+        self.reader = reader
+        self.settle_s = settle_s
+        self.events = queue.Queue()
+        self._commands = queue.Queue()
+        self._last_write = -float("inf")
+        self._late = {}  # answer kind owed to a failed command -> time.monotonic() it expires
+
+    def submit(self, payload: bytes, expect, timeout=5.0, idle_timeout=3.0, retries=1) -> Future:
+        future = Future()
+        self._commands.put((Command(payload, expect, timeout, idle_timeout, retries), future))
+        return future
+
+    def sweep(self, payload: bytes, timeout=75.0, idle_timeout=5.0, retries=0) -> Future:
+        """Future of the SweepResult answering ``payload`` (init_start, start, ...)."""
+        return self.submit(payload, "sweep", timeout, idle_timeout, retries)
+
+    def temp(self, timeout=3.0, retries=1) -> Future:
+        """Future of the raw 'temp&hum' line."""
+        return self.submit(b"temp", "env", timeout, timeout, retries)
+
+    def close(self, timeout=2.0):
+        self._commands.put(None)
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        while True:
+            item = self._commands.get()
+            if item is None:
+                break
+            command, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._execute(command))
+            except SessionError as exc:
+                future.set_exception(exc)
+
+    def _execute(self, command):
+        for attempt in range(command.retries + 1):
+            wait = self._last_write + self.settle_s - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                self.ser.write(command.payload + b"\n")
+            except OSError as exc:  # SerialException, e.g. the board was unplugged
+                raise SessionError(f"serial link lost: {exc}") from exc
+            self._last_write = time.monotonic()
+            answer = self._await(command)
+            if answer is _CORRUPT:
+                failure = "corrupt answer"
+            elif answer is _CUT_OFF:
+                failure = "answer cut off"
+                self._late[command.expect] = time.monotonic() + command.timeout
+            elif answer is not None:
+                return answer
+            else:
+                failure = "no answer"
+            self.reader.resync()
+        raise SessionError(f"{command.payload.decode()}: {failure} after {command.retries + 1} attempts")
+
+    def _await(self, command):
+        """The answer to ``command``; None or _CUT_OFF when a deadline passes, _CORRUPT for a bad frame."""
+        deadline = time.monotonic() + command.timeout
+        started = False  # ASCII rows of the answer arrived
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return _CUT_OFF if started else None
+            try:
+                kind, payload = self.reader.events.get(timeout=min(remaining, 0.1))
+            except queue.Empty:
+                if not self.reader.is_alive():
+                    raise SessionError("serial link lost")
+                continue
+            if self._is_late(kind):
+                if kind == command.expect:  # ours comes after it
+                    deadline = time.monotonic() + command.timeout
+                continue
+            if kind == command.expect:
+                return payload
+            if kind == "error":
+                if not self.reader.is_alive():
+                    raise SessionError(f"serial link lost: {payload}")
+                return _CORRUPT
+            if kind == "partial":
+                started = started or command.expect == "sweep"
+                deadline = time.monotonic() + command.idle_timeout
+            self.events.put((kind, payload))
+
+    def _is_late(self, kind):
+        """True for an event of an answer owed to a failed command; consumes the answer."""
+        answer = "sweep" if kind == "partial" else kind  # live rows belong to the sweep
+        expires = self._late.get(answer)
+        if expires is None:
+            return False
+        if time.monotonic() > expires:  # not coming any more
+            del self._late[answer]
+            return False
+        if kind == answer:
+            del self._late[answer]
+        return True
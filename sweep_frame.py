@@ -0,0 +1,111 @@
+"""Binary sweep frame, the compact alternative to the six ASCII rows.
+
+Sent by the firmware in answer to ``init_start_bin``/``start_bin``.
+All fields are little-endian::
+
+    offset  size  field
+    0       2     magic b"\\xa5\\x5a"
+    2       1     version (FRAME_VERSION)
+    3       1     kind: KIND_PHASE_MAG_F32 or KIND_REAL_IMAG_I16
+    4       1     channels
+    5       1     channel mask (bit n set = channel n+1 swept)
+    6       2     points per block
+    8       4     temperature, float32
+    12      4     humidity, float32
+    16      ...   per channel: phase block, magnitude block
+                  (real and imaginary blocks for KIND_REAL_IMAG_I16)
+    end-4   4     CRC-32 (zlib) of everything before it
+
+Flow control: the frame goes out in FRAME_CHUNK byte chunks and the board
+may have FRAME_WINDOW chunks unacknowledged. The host answers chunk ``k``
+with one FRAME_ACK byte once it has arrived, but only if the board still
+needs that credit (``k + FRAME_WINDOW < chunks``), so no stray ack bytes
+are left in front of the next command. See ``frame_acks``.
+"""
+
+import struct
+import zlib
+from typing import NamedTuple
+
+import numpy as np
+
+FRAME_MAGIC = b"\xa5\x5a"
+FRAME_VERSION = 1
+
+FRAME_CHUNK = 256
+FRAME_WINDOW = 4
+FRAME_ACK = b"\x06"
+
+KIND_PHASE_MAG_F32 = 0
+KIND_REAL_IMAG_I16 = 1
+
+_HEADER = struct.Struct("<2sBBBBHff")
+_CRC = struct.Struct("<I")
+HEADER_SIZE = _HEADER.size
+_DTYPES = {
+    KIND_PHASE_MAG_F32: np.dtype("<f4"),
+    KIND_REAL_IMAG_I16: np.dtype("<i2"),
+}
+
+
+class SweepFrame(NamedTuple):
+    kind: int
+    data: np.ndarray      # (channels, 2, points), read-only view on the frame
+    channel_mask: int
+    temperature: float
+    humidity: float
+
+
+def frame_size(header: bytes) -> int:
+    """Total frame length in bytes, given at least HEADER_SIZE leading bytes."""
+    magic, version, kind, channels, _, points, _, _ = _HEADER.unpack_from(header)
+    if magic != FRAME_MAGIC:
+        raise ValueError("bad frame magic")
+    if version != FRAME_VERSION:
+        raise ValueError(f"unsupported frame version {version}")
+    if kind not in _DTYPES:
+        raise ValueError(f"unknown frame kind {kind}")
+    return HEADER_SIZE + channels * 2 * points * _DTYPES[kind].itemsize + _CRC.size
+
+
+def frame_acks(size: int, received: int) -> int:
+    """Chunks of a ``size`` byte frame the host should have acked after ``received`` bytes."""
+    chunks = -(-size // FRAME_CHUNK)
+    return max(0, min(received // FRAME_CHUNK, chunks - FRAME_WINDOW))
+
+
+def encode_frame(data, kind=KIND_PHASE_MAG_F32, channel_mask=None,
+                 temperature=0.0, humidity=0.0) -> bytes:
+    """Pack a (channels, 2, points) array the same way the firmware does."""
+    dtype = _DTYPES[kind]
+    block = np.ascontiguousarray(data, dtype=dtype)
+    channels, _, points = block.shape
+    if channel_mask is None:
+        channel_mask = (1 << channels) - 1
+    body = _HEADER.pack(FRAME_MAGIC, FRAME_VERSION, kind, channels,
+                        channel_mask, points, temperature, humidity) + block.tobytes()
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def decode_frame(buf) -> SweepFrame:
+    """Decode one complete frame without copying the payload."""
+    size = frame_size(buf)
+    if len(buf) < size:
+        raise ValueError("truncated frame")
+    body = memoryview(buf)[:size - _CRC.size]
+    (crc,) = _CRC.unpack_from(buf, size - _CRC.size)
+    if zlib.crc32(body) != crc:
+        raise ValueError("frame CRC mismatch")
+    _, _, kind, channels, mask, points, temperature, humidity = _HEADER.unpack_from(buf)
+    data = np.frombuffer(buf, dtype=_DTYPES[kind], count=channels * 2 * points,
+                         offset=HEADER_SIZE).reshape(channels, 2, points)
+    return SweepFrame(kind, data, mask, temperature, humidity)
+
+
+def phase_magnitude(frame: SweepFrame) -> np.ndarray:
+    """(channels, 2, points) phase in degrees and magnitude, as SweepAndProcess computes them."""
+    if frame.kind == KIND_PHASE_MAG_F32:
+        return frame.data
+    real = frame.data[:, 0].astype(np.float32)
+    imag = frame.data[:, 1].astype(np.float32)
+    return np.stack([np.degrees(np.arctan2(imag, real)), np.hypot(real, imag)], axis=1)
@@ -0,0 +1,127 @@
+"""N-channel sweep container.
+
+A ``Sweep`` is one board's answer to a sweep command: a preallocated
+float32 array shaped (channels, 2, points), with phase at index 0 and
+magnitude at index 1 of the middle axis, plus the metadata needed to
+interpret it (start frequencies, step, channel mask, environment, device).
+
+``rows`` is a view in the interleaved (phase1, mag1, phase2, mag2, ...)
+layout that FeatureEngine, the archive and LivePlot take, so analysis
+stays one batched call however many channels there are. ``concat`` joins
+the sweeps of several boards along the channel axis for the same reason.
+
+Channels the board did not sweep (clear in the channel mask) hold whatever
+the firmware's arrays held before. ``from_result`` sets them to NaN, so
+they cannot be mistaken for data; ScoringEngine leaves them out. Only
+binary frames carry the mask: in ASCII mode the board prints the stale
+arrays of skipped channels like any other, and they count as swept.
+"""
+
+import time
+
+import numpy as np
+
+from analysis import read_environment
+
+PHASE = 0
+MAGNITUDE = 1
+
+
+class Sweep:
+    __slots__ = ("data", "valid", "start_frequencies", "step", "channel_mask",
+                 "temperature", "humidity", "timestamp", "devices")
+
+    def __init__(self, data, start_frequencies, step=1.0, valid=None, channel_mask=None,
+                 temperature=None, humidity=None, timestamp=None, device=""):
+        data = np.asarray(data, dtype=np.float32)
+        if data.ndim != 3 or data.shape[1] != 2:
+            raise ValueError(f"expected (channels, 2, points), got {data.shape}")
+        channels = data.shape[0]
+        if len(start_frequencies) != channels:
+            raise ValueError(f"{len(start_frequencies)} start frequencies for {channels} channels")
+        self.data = data
+        self.valid = np.ones(data.shape, dtype=bool) if valid is None else np.asarray(valid).reshape(data.shape)
+        self.start_frequencies = np.asarray(start_frequencies, dtype=np.float64)
+        self.step = step
+        self.channel_mask = (1 << channels) - 1 if channel_mask is None else channel_mask
+        self.temperature = temperature
+        self.humidity = humidity
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.devices = (device,) * channels  # board of every channel
+
+    @classmethod
+    def empty(cls, start_frequencies, points, **meta):
+        """Zeroed sweep to be filled in place."""
+        return cls(np.zeros((len(start_frequencies), 2, points), dtype=np.float32), start_frequencies, **meta)
+
+    @classmethod
+    def from_rows(cls, rows, start_frequencies, **meta):
+        """Wrap a (2 * channels, points) interleaved array, e.g. SweepResult.data."""
+        rows = np.asarray(rows, dtype=np.float32)
+        return cls(rows.reshape(rows.shape[0] // 2, 2, rows.shape[1]), start_frequencies, **meta)
+
+    @classmethod
+    def from_result(cls, result, start_frequencies, step=1.0, device=""):
+        """Sweep from a SweepReader ``SweepResult``; unswept channels become NaN."""
+        t, h = read_environment(result.env_line) or (None, None)
+        sweep = cls.from_rows(result.data, start_frequencies, step=step, valid=result.valid,
+                              channel_mask=result.channel_mask, temperature=t, humidity=h, device=device)
+        swept = sweep.swept()
+        if not swept.all():
+            sweep.data = sweep.data.copy()  # frame data is a read-only view
+            sweep.data[~swept] = np.nan
+            sweep.valid = sweep.valid.copy()
+            sweep.valid[~swept] = False
+        return sweep
+
+    @property
+    def channels(self):
+        return self.data.shape[0]
+
+    @property
+    def points(self):
+        return self.data.shape[2]
+
+    @property
+    def phase(self):
+        return self.data[:, PHASE]
+
+    @property
+    def magnitude(self):
+        return self.data[:, MAGNITUDE]
+
+    @property
+    def rows(self):
+        """(2 * channels, points) view: phase1, mag1, phase2, mag2, ..."""
+        return self.data.reshape(-1, self.points)
+
+    def frequencies(self):
+        """(channels, points) frequency axis of every channel, in Hz."""
+        return self.start_frequencies[:, None] + np.arange(self.points) * self.step
+
+    def swept(self):
+        """Boolean (channels,) mask of the channels the board actually swept."""
+        return (self.channel_mask >> np.arange(self.channels)) & 1 == 1
+
+
+def concat(sweeps):
+    """Join the sweeps of several boards along the channel axis."""
+    sweeps = list(sweeps)
+    if len({s.points for s in sweeps}) != 1 or len({s.step for s in sweeps}) != 1:
+        raise ValueError("sweeps differ in points or step")
+    mask, shift = 0, 0
+    for s in sweeps:
+        mask |= s.channel_mask << shift
+        shift += s.channels
+    combined = Sweep(
+        np.concatenate([s.data for s in sweeps]),
+        np.concatenate([s.start_frequencies for s in sweeps]),
+        step=sweeps[0].step,
+        valid=np.concatenate([s.valid for s in sweeps]),
+        channel_mask=mask,
+        temperature=sweeps[0].temperature,
+        humidity=sweeps[0].humidity,
+        timestamp=min(s.timestamp for s in sweeps),
+    )
+    combined.devices = tuple(d for s in sweeps for d in s.devices)
+    return combined
@@ -0,0 +1,270 @@
+"""Background serial reader for the sweep responses sent by the Arduino.
+
+The firmware answers ``init_start``/``start`` with six comma separated rows
+(phase and magnitude for channels 1-3) followed by a ``temp&hum`` line, and
+``temp`` with the ``temp&hum`` line alone. ``init_start_bin``/``start_bin``
+get a single binary frame instead (see sweep_frame.py). The reader thread
+consumes bytes as they arrive and hands finished results to the Tk loop
+through a queue.
+"""
+
+import queue
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from sanitize import fill_invalid, parse_row
+from sweep_frame import (FRAME_ACK, FRAME_MAGIC, HEADER_SIZE, decode_frame, frame_acks,
+                         frame_size, phase_magnitude)
+from timing import recorder, span
+
+SWEEP_ROWS = 6        # phase1, mag1, phase2, mag2, phase3, mag3
+SWEEP_POINTS = 501    # NUM_INCREMENTS in the firmware
+
+
+class SweepResult(NamedTuple):
+    data: np.ndarray      # (SWEEP_ROWS, SWEEP_POINTS), read-only for binary frames
+    rows: int             # rows received before the env line
+    env_line: str         # trailing 'temp&hum' line
+    valid: np.ndarray     # False where the firmware sent ovf/nan (now interpolated)
+    channel_mask: int     # bit n set: channel n+1 was swept (binary frames only, see _handle_line)
+
+
+def _is_env_line(line: bytes) -> bool:
+    if b"&" in line:
+        return True
+    try:
+        float(line)
+    except ValueError:
+        return False
+    return True
+
+
+class SweepParser:
+    """Incremental parser, fed with raw bytes in arbitrary chunks.
+
+    ``feed`` returns a list of ``(kind, payload)`` events:
+    ``("sweep", SweepResult)``, ``("env", str)``, ``("text", str)``,
+    ``("error", str)`` for a binary frame that failed to decode, and
+    ``("partial", (row, start, values))`` with the raw values of an ASCII
+    row that arrived since the previous chunk, for live display, and
+    ``("ack", n)`` when ``n`` FRAME_ACK bytes are due to the board.
+    """
+
+    def __init__(self, rows=SWEEP_ROWS, points=SWEEP_POINTS):
+        self.rows = rows
+        self.points = points
+        self._buf = bytearray()
+        self._new_block()
+
+    def _new_block(self):
+        self._data = np.zeros((self.rows, self.points))
+        self._valid = np.zeros((self.rows, self.points), dtype=bool)
+        self._row = 0
+        self._partial_pos = 0    # bytes of the pending line already reported
+        self._partial_count = 0  # values of the pending line already reported
+        self._acked = 0          # flow-control chunks acked of the frame being received
+
+    def reset(self):
+        self._buf.clear()
+        self._new_block()
+
+    @property
+    def receiving(self):
+        """True while part of a line, row block or frame is buffered."""
+        return bool(self._buf) or self._row > 0
+
+    def feed(self, chunk: bytes):
+        self._buf += chunk
+        events = []
+        while True:
+            if self._buf[:1] == FRAME_MAGIC[:1]:
+                event, complete = self._take_frame()
+                if event:
+                    events.append(event)
+                if not complete:
+                    break
+                continue
+            nl = self._buf.find(b"\n")
+            if nl < 0:
+                break
+            line = bytes(self._buf[:nl])
+            del self._buf[:nl + 1]
+            if b"," in line and self._row < self.rows:
+                tail, _ = parse_row(line[self._partial_pos:])
+                if tail.size:
+                    events.append(("partial", (self._row, self._partial_count, tail)))
+            self._partial_pos = self._partial_count = 0
+            line = line.strip()
+            event = self._handle_line(line)
+            if event:
+                events.append(event)
+        event = self._take_partial()
+        if event:
+            events.append(event)
+        return events
+
+    def _take_partial(self):
+        """Values completed on the pending (unterminated) row since the last call."""
+        if self._row >= self.rows or self._buf[:1] == FRAME_MAGIC[:1]:
+            return None
+        end = self._buf.rfind(b",")
+        if end < self._partial_pos:
+            return None
+        values, _ = parse_row(bytes(self._buf[self._partial_pos:end]))
+        start = self._partial_count
+        self._partial_pos = end + 1
+        self._partial_count += values.size
+        return ("partial", (self._row, start, values))
+
+    def _take_frame(self):
+        """Consume a binary frame at the start of the buffer.
+
+        Returns ``(event, complete)``; ``complete`` is False while more
+        bytes are needed.
+        """
+        if len(self._buf) < HEADER_SIZE:
+            return None, False
+        try:
+            size = frame_size(self._buf)
+        except ValueError as exc:
+            del self._buf[:1]  # not a frame after all, resync on the next byte
+            return ("error", str(exc)), True
+        if len(self._buf) < size:
+            acks = frame_acks(size, len(self._buf)) - self._acked
+            if acks > 0:
+                self._acked += acks
+                return ("ack", acks), False
+            return None, False
+        self._acked = 0
+        raw = bytes(self._buf[:size])
+        del self._buf[:size]
+        try:
+            frame = decode_frame(raw)
+        except ValueError as exc:
+            return ("error", str(exc)), True
+        data = phase_magnitude(frame)
+        if self._row:
+            # a frame supersedes any partial ASCII sweep
+            self._new_block()
+        rows = data.reshape(-1, data.shape[-1])
+        valid = np.isfinite(rows)
+        if not valid.all():
+            rows = fill_invalid(rows.copy(), valid)
+        env_line = f"{frame.temperature:.2f}&{frame.humidity:.2f}"
+        return ("sweep", SweepResult(rows, rows.shape[0], env_line, valid, frame.channel_mask)), True
+
+    def _fill_row(self, line: bytes):
+        values, valid = parse_row(line, self.points)
+        self._data[self._row] = fill_invalid(values, valid)
+        self._valid[self._row] = valid
+        self._row += 1
+
+    def _handle_line(self, line: bytes):
+        if not line:
+            return None
+        if b"," in line:
+            if self._row < self.rows:
+                self._fill_row(line)
+            return None
+        text = line.decode("utf-8", errors="replace")
+        if _is_env_line(line):
+            if self._row == 0:
+                return ("env", text)
+            # ASCII sweeps carry no mask and the firmware prints every channel, skipped ones
+            # with their stale arrays, so every channel received counts as swept
+            result = SweepResult(self._data, self._row, text, self._valid, (1 << (self._row // 2)) - 1)
+            self._new_block()
+            return ("sweep", result)
+        return ("text", text)
+
+
+class SweepReader(threading.Thread):
+    """Daemon thread that reads ``ser`` and posts parser events to ``events``."""
+
+    def __init__(self, ser, events=None, rows=SWEEP_ROWS, points=SWEEP_POINTS):
+        super().__init__(name="sweep-reader", daemon=True)
+        self.ser = ser
+        self.events = events if events is not None else queue.Queue()
+        self.parser = SweepParser(rows, points)
+        self._stop_event = threading.Event()
+        self._resync_event = threading.Event()
+
+    def run(self):
+        block_start = None  # chunk that started the answer being received
+        while not self._stop_event.is_set():
+            try:
+                # blocks for at most ser.timeout when nothing is pending
+                chunk = self.ser.read(self.ser.in_waiting or 1)
+            except OSError as exc:  # SerialException, e.g. the board was unplugged
+                self.events.put(("error", str(exc)))
+                return
+            if self._resync_event.is_set():
+                self._resync_event.clear()
+                self.parser.reset()
+                block_start = None
+            if not chunk:
+                continue
+            received = time.perf_counter()
+            if block_start is None:
+                block_start = received
+            with span("serial_parse"):
+                events = self.parser.feed(chunk)
+            for event in events:
+                if event[0] == "ack":
+                    self._write_ack(event[1])
+                    continue
+                if event[0] == "partial":
+                    self.events.put(event)
+                    continue
+                # an answer is complete: the next one starts with a later byte
+                if event[0] == "sweep" and block_start is not None:  # None: second sweep in one chunk
+                    recorder.record("sweep_transfer", time.perf_counter() - block_start)
+                block_start = None
+                self.events.put(event)
+            if block_start is None and self.parser.receiving:
+                block_start = received  # the chunk also began the next answer
+
+    def _write_ack(self, count):
+        try:
+            self.ser.write(FRAME_ACK * count)
+        except OSError as exc:
+            self.events.put(("error", str(exc)))
+
+    def stop(self, timeout=2.0):
+        """Stop reading; waits for the current read so the port can be closed safely."""
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def resync(self):
+        """Drop the partially received line or frame, from any thread."""
+        self._resync_event.set()
+
+    def take(self, kind):
+        """Return the next queued payload of ``kind`` or None, dropping others."""
+        while True:
+            try:
+                k, payload = self.events.get_nowait()
+            except queue.Empty:
+                return None
+            if k == kind:
+                return payload
+
+    def drain(self):
+        """All queued events, oldest first."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def discard_pending(self):
+        while True:
+            try:
+                self.events.get_nowait()
+            except queue.Empty:
+                return
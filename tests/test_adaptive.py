@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from adaptive import AdaptiveMeasurement, ConvergencePolicy, RunningStats
+from emulator import DeviceEmulator
+
+
+def test_running_stats_match_numpy():
+    samples = np.random.default_rng(0).normal(5.0, 2.0, (50, 3))
+    stats = RunningStats(3)
+    for x in samples:
+        stats.update(x)
+    assert stats.n == 50
+    np.testing.assert_allclose(stats.mean, samples.mean(axis=0))
+    np.testing.assert_allclose(stats.variance, samples.var(axis=0, ddof=1))
+    np.testing.assert_allclose(stats.half_width(), 1.96 * samples.std(axis=0, ddof=1) / np.sqrt(50))
+
+
+def test_one_sample_has_no_variance():
+    stats = RunningStats(2)
+    stats.update([1.0, 2.0])
+    assert np.isinf(stats.variance).all() and np.isinf(stats.half_width()).all()
+
+
+@pytest.fixture(scope="module")
+def emulator():
+    return DeviceEmulator(banner=False, seed=0, peak_shift=6.0, noise=0.05)
+
+
+def test_identical_sweeps_converge_at_min_sweeps(emulator):
+    normal = emulator.sweep(True)
+    measurement = AdaptiveMeasurement(emulator.sweep(False), policy=ConvergencePolicy(min_sweeps=2))
+    measurement.add(normal)
+    assert not measurement.done
+    measurement.add(normal)
+    assert measurement.converged and measurement.done
+    result = measurement.result()
+    assert result.sweeps == 2 and result.confidence == 0.0
+    np.testing.assert_allclose(result.mean_sweep, normal)
+
+
+def test_stops_at_max_sweeps_without_converging(emulator):
+    rng = np.random.default_rng(1)
+    measurement = AdaptiveMeasurement(emulator.sweep(False), policy=ConvergencePolicy(tolerance=0.0, max_sweeps=3))
+    while not measurement.done:
+        measurement.add(np.roll(emulator.sweep(True), rng.integers(-20, 20), axis=-1))
+    result = measurement.result()
+    assert result.sweeps == 3 and not result.converged
+    assert result.quality == tuple(int(round(v)) for v in result.phase_shift)
+
+
+def test_result_needs_a_sweep(emulator):
+    with pytest.raises(ValueError):
+        AdaptiveMeasurement(emulator.sweep(False)).result()
@@ -0,0 +1,81 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from archive import MeasurementArchive, load_range, open_session
+
+ROWS, POINTS = 6, 8
+
+
+def write_session(directory, name, timestamps):
+    archive = MeasurementArchive(str(directory), rows=ROWS, points=POINTS)
+    archive.path = os.path.join(str(directory), f"session-{name}.rec")
+    for t in timestamps:
+        sweep = np.full((ROWS, POINTS), t, dtype=np.float32)
+        archive.append(sweep, sweep + 1, 21.0, None, 4.5, [1, 2, 3], timestamp=t)
+    archive.close()
+    return archive
+
+
+def test_append_then_open(tmp_path):
+    archive = write_session(tmp_path, "a", [10.0, 11.0])
+    records = open_session(archive.path)
+    assert len(records) == 2
+    assert records["timestamp"].tolist() == [10.0, 11.0]
+    assert np.isnan(records["humidity"]).all()
+    assert records["score"].tolist() == [4.5, 4.5]
+    np.testing.assert_array_equal(records["phase_shift"][1], [1, 2, 3])
+    np.testing.assert_array_equal(records["normal"][0], np.full((ROWS, POINTS), 11.0))
+    assert archive.failures == 0
+
+
+def test_torn_last_record_is_ignored(tmp_path):
+    archive = write_session(tmp_path, "a", [10.0, 11.0])
+    with open(archive.path, "ab") as f:
+        f.write(b"\0" * 17)  # the app died halfway through a write
+    assert open_session(archive.path)["timestamp"].tolist() == [10.0, 11.0]
+
+
+def test_load_range_across_sessions(tmp_path):
+    write_session(tmp_path, "a", [10.0, 11.0, 12.0])
+    write_session(tmp_path, "b", [20.0, 21.0])
+    assert load_range(str(tmp_path))["timestamp"].tolist() == [10.0, 11.0, 12.0, 20.0, 21.0]
+    assert load_range(str(tmp_path), 11.0, 21.0)["timestamp"].tolist() == [11.0, 12.0, 20.0]
+    assert load_range(str(tmp_path), 13.0, 20.0) is None
+
+
+def test_version_1_sessions_still_open(tmp_path):
+    archive = write_session(tmp_path, "a", [10.0])
+    meta_path = archive.path[:-len(".rec")] + ".json"
+    with open(meta_path) as f:
+        meta = json.load(f)
+    v1 = np.dtype([("timestamp", "<f8"), ("temperature", "<f4"), ("humidity", "<f4"),
+                   ("quality", "<f4", (3,)), ("init", "<f4", (ROWS, POINTS)), ("normal", "<f4", (ROWS, POINTS))])
+    meta.update(version=1, descr=np.lib.format.dtype_to_descr(v1))
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    with open(archive.path, "wb") as f:
+        f.write(np.zeros(2, dtype=v1).tobytes())
+    assert open_session(archive.path)["quality"].shape == (2, 3)
+
+
+def test_unsupported_version(tmp_path):
+    archive = write_session(tmp_path, "a", [10.0])
+    with open(archive.path[:-len(".rec")] + ".json", "w") as f:
+        f.write('{"version": 999, "descr": []}')
+    with pytest.raises(ValueError, match="version"):
+        open_session(archive.path)
+
+
+def test_failed_write_is_counted_and_logged(tmp_path):
+    archive = MeasurementArchive(str(tmp_path), rows=ROWS, points=POINTS)
+
+    def broken():
+        raise OSError("disk full")
+    archive.submit(broken)
+    archive.close()
+    assert archive.failures == 1
+    with open(tmp_path / "errors.jsonl") as f:
+        assert "disk full" in f.read()
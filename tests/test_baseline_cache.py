@@ -0,0 +1,54 @@
+import numpy as np
+
+from baseline_cache import BaselineCache, BaselineEntry, StalenessPolicy
+
+FREQUENCIES = (16900, 17235, 17330)
+DATA = np.arange(12.0).reshape(6, 2)
+
+
+def test_store_then_get_from_a_new_cache(tmp_path):
+    path = tmp_path / "baseline.npz"
+    BaselineCache(path, FREQUENCIES).store(DATA, 21.0, 40.0, timestamp=1000.0)
+    entry = BaselineCache(path, FREQUENCIES).get(21.5, now=1060.0)
+    np.testing.assert_array_equal(entry.data, DATA)
+    assert (entry.timestamp, entry.temperature, entry.humidity) == (1000.0, 21.0, 40.0)
+    assert not (tmp_path / "baseline.npz.tmp").exists()
+
+
+def test_staleness_policy():
+    policy = StalenessPolicy(max_age_s=60, max_temp_drift=1.0)
+    entry = BaselineEntry(DATA, 1000.0, 21.0, 40.0, FREQUENCIES)
+    assert policy.is_fresh(entry, 1060.0, 22.0)
+    assert not policy.is_fresh(entry, 1061.0, 21.0)
+    assert not policy.is_fresh(entry, 1000.0, 22.5)
+    assert not policy.is_fresh(entry, 1000.0, None)
+
+
+def test_peek_ignores_temperature_but_not_age(tmp_path):
+    cache = BaselineCache(tmp_path / "b.npz", FREQUENCIES, StalenessPolicy(max_age_s=60))
+    cache.store(DATA, 21.0, 40.0, timestamp=1000.0)
+    assert cache.get(30.0, now=1010.0) is None
+    assert cache.peek(now=1010.0) is not None
+    assert cache.peek(now=1100.0) is None
+
+
+def test_other_frequencies_miss(tmp_path):
+    path = tmp_path / "b.npz"
+    BaselineCache(path, FREQUENCIES).store(DATA, 21.0, 40.0, timestamp=1000.0)
+    assert BaselineCache(path, (16900, 17235, 17400)).peek(now=1000.0) is None
+
+
+def test_missing_or_corrupt_file_is_a_miss(tmp_path):
+    path = tmp_path / "b.npz"
+    assert BaselineCache(path, FREQUENCIES).peek() is None
+    path.write_bytes(b"not a baseline")
+    assert BaselineCache(path, FREQUENCIES).peek() is None
+
+
+def test_invalidate_removes_the_file(tmp_path):
+    path = tmp_path / "b.npz"
+    cache = BaselineCache(path, FREQUENCIES)
+    cache.store(DATA, 21.0, None, timestamp=1000.0)
+    cache.invalidate()
+    assert not path.exists() and cache.peek(now=1000.0) is None
+    cache.invalidate()  # nothing left to remove
@@ -0,0 +1,41 @@
+import pytest
+import serial
+
+from boards import Board, BoardGroup
+from emulator import DeviceEmulator
+from serial_session import SessionError
+
+
+@pytest.fixture
+def group():
+    emulators = [DeviceEmulator(banner=False, seed=0),
+                 DeviceEmulator(banner=False, seed=1, start_frequencies=(18000, 18100))]
+    boards = []
+    for name, emulator in zip("ab", emulators):
+        emulator.start()
+        boards.append(Board(name, serial.Serial(emulator.port, 115200, timeout=0.05), emulator.start_frequencies))
+    group = BoardGroup(boards)
+    group.start()
+    yield group, emulators
+    group.close()
+    for emulator in emulators:
+        emulator.stop()
+
+
+@pytest.mark.parametrize("command", [b"start", b"start_bin"])
+def test_two_boards_measure_as_one_sweep(group, command):
+    group, emulators = group
+    sweep = group.measure(command, timeout=10.0)
+    assert group.channels == sweep.channels == 5
+    assert sweep.rows.shape == (10, 501)
+    assert sweep.devices == ("a", "a", "a", "b", "b")
+    assert sweep.start_frequencies.tolist() == [16900, 17235, 17330, 18000, 18100]
+    assert sweep.swept().all()
+    assert [e.commands for e in emulators] == [[command.decode()]] * 2
+
+
+def test_failed_board_is_named(group):
+    group, emulators = group
+    emulators[1].handle = emulators[1].commands.append  # board b never answers
+    with pytest.raises(SessionError, match="from b$"):
+        group.measure(b"start_bin", timeout=0.5)
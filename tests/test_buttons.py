@@ -0,0 +1,36 @@
+from buttons import SimulatedBackend
+
+PINS = {17: "ok", 22: "down"}
+DEBOUNCE = {17: 200, 22: 100}
+
+
+def test_presses_are_queued_in_order():
+    backend = SimulatedBackend(PINS, DEBOUNCE)
+    backend.press("ok", now_ms=0)
+    backend.press("down", now_ms=10)
+    assert backend.pending() == ["ok", "down"]
+    assert backend.pending() == []
+
+
+def test_bounce_within_debounce_is_dropped():
+    backend = SimulatedBackend(PINS, DEBOUNCE)
+    for t in (0, 50, 199, 200, 250):
+        backend.press("ok", now_ms=t)
+    assert backend.pending() == ["ok", "ok"]
+
+
+def test_debounce_is_per_button():
+    backend = SimulatedBackend(PINS, DEBOUNCE)
+    backend.press("ok", now_ms=0)
+    backend.press("down", now_ms=1)
+    backend.press("down", now_ms=101)
+    assert backend.pending() == ["ok", "down", "down"]
+
+
+def test_notify_after_each_accepted_press():
+    backend = SimulatedBackend(PINS, DEBOUNCE)
+    calls = []
+    backend.notify = lambda: calls.append(1)
+    backend.press("ok", now_ms=0)
+    backend.press("ok", now_ms=1)
+    assert len(calls) == 1
@@ -0,0 +1,109 @@
+import struct
+
+import numpy as np
+import pytest
+import serial
+
+from capture import BAUD, RX, TX, ReplaySerial, main, open_serial, read_capture
+from emulator import DeviceEmulator
+from sweep_reader import SweepReader
+
+
+def next_sweep(reader):
+    while True:
+        kind, payload = reader.events.get(timeout=10)
+        if kind == "sweep":
+            return payload
+
+
+@pytest.fixture
+def capture(tmp_path):
+    """A capture of one ASCII and one binary sweep from the emulator."""
+    emulator = DeviceEmulator(banner=False, seed=0)
+    emulator.start()
+    ser = open_serial(emulator.port, 115200, timeout=0.05, capture_dir=str(tmp_path))
+    reader = SweepReader(ser)
+    reader.start()
+    sweeps = []
+    for command in (b"init_start\n", b"start_bin\n"):
+        ser.write(command)
+        sweeps.append(next_sweep(reader))
+    ser.baudrate = 500000
+    reader.stop()
+    ser.close()
+    emulator.stop()
+    return ser.path, sweeps
+
+
+def replay_sweeps(ser, count):
+    reader = SweepReader(ser)
+    reader.start()
+    try:
+        sweeps = []
+        for command in (b"init_start\n", b"start_bin\n")[:count]:
+            ser.write(command)
+            sweeps.append(next_sweep(reader))
+        return sweeps
+    finally:
+        reader.stop()
+
+
+def test_capture_records_both_directions(capture):
+    path, _ = capture
+    _, baudrate, records = read_capture(path)
+    assert baudrate == 115200
+    sent = b"".join(r.data for r in records if r.direction == TX).replace(b"\x06", b"")
+    assert sent == b"init_start\nstart_bin\n"
+    assert sum(len(r.data) for r in records if r.direction == RX) > 12000
+    assert [struct.unpack("<I", r.data)[0] for r in records if r.direction == BAUD] == [500000]
+    offsets = [r.offset for r in records]
+    assert offsets == sorted(offsets)
+
+
+@pytest.mark.parametrize("speed", [0.0, 50.0])
+def test_replay_gives_the_captured_sweeps(capture, speed):
+    path, captured = capture
+    ser = ReplaySerial(path, speed=speed, timeout=0.05, follow_writes=True)
+    for replayed, original in zip(replay_sweeps(ser, 2), captured):
+        np.testing.assert_array_equal(replayed.data, original.data)
+        assert replayed.env_line == original.env_line
+    assert ser.finished
+
+
+def test_follow_writes_waits_for_the_command(capture):
+    path, _ = capture
+    ser = ReplaySerial(path, speed=0.0, timeout=0.1, follow_writes=True)
+    assert ser.read(100) == b""  # nothing before the app sends init_start
+    ser.write(b"init_start\n")
+    assert ser.read(100)
+
+
+def test_truncated_capture_drops_the_torn_record(capture, tmp_path):
+    path, _ = capture
+    with open(path, "rb") as f:
+        blob = f.read()
+    torn = tmp_path / "torn.cap"
+    torn.write_bytes(blob[:-3])
+    assert len(read_capture(str(torn))[2]) == len(read_capture(path)[2]) - 1
+
+
+def test_not_a_capture(tmp_path):
+    path = tmp_path / "x.cap"
+    path.write_bytes(b"garbage")
+    with pytest.raises(serial.SerialException):
+        ReplaySerial(str(path))
+
+
+def test_unwritable_capture_dir_is_a_serial_error(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    with pytest.raises(serial.SerialException, match="cannot capture"):
+        open_serial("/dev/null", 115200, capture_dir=str(blocker / "sub"))
+
+
+def test_cli(capture, capsys):
+    path, _ = capture
+    assert main(["info", path]) == 0
+    assert "init_start" in capsys.readouterr().out
+    assert main(["replay", path, "--speed", "0"]) == 0
+    assert "2 sweep" in capsys.readouterr().out
@@ -0,0 +1,92 @@
+from concurrent.futures import Future
+
+import pytest
+
+from analysis import read_environment
+from env_sampler import EnvCache, EnvSampler
+
+
+class FakeRoot:
+    """Tk's after/after_cancel, run by hand."""
+
+    def __init__(self):
+        self.jobs = {}
+
+    def after(self, ms, fn):
+        job = len(self.jobs) + 1
+        self.jobs[job] = fn
+        return job
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run(self):
+        jobs, self.jobs = self.jobs, {}
+        for fn in jobs.values():
+            fn()
+
+
+class FakeSession:
+    def __init__(self):
+        self.requests = []
+
+    def temp(self):
+        future = Future()
+        self.requests.append(future)
+        return future
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("21.50&45.00", (21.5, 45.0)),
+    ("21.5", (21.5, None)),
+    ("0.00&0.00", None),
+    ("garbage", None),
+])
+def test_read_environment(line, expected):
+    assert read_environment(line) == expected
+
+
+def test_latest_expires_after_ttl():
+    cache = EnvCache(ttl_s=30.0)
+    assert cache.latest(now=0.0) is None
+    cache.update(21.0, 40.0, now=100.0)
+    assert cache.latest(now=130.0).temperature == 21.0
+    assert cache.latest(now=130.1) is None
+
+
+def test_drift_in_degrees_per_minute():
+    cache = EnvCache()
+    for minute in range(5):
+        cache.update(20.0 + 0.5 * minute, 40.0, now=60.0 * minute)
+    assert cache.drift(now=240.0) == pytest.approx(0.5)
+    assert cache.drift(window_s=30.0, now=240.0) is None  # one reading in the window
+
+
+def test_history_is_bounded():
+    cache = EnvCache(history=3)
+    for i in range(5):
+        cache.update(float(i), None, now=float(i))
+    assert [r.temperature for r in cache.history] == [2.0, 3.0, 4.0]
+
+
+def test_sampler_caches_answers_but_not_failed_readings():
+    root, session, cache = FakeRoot(), FakeSession(), EnvCache()
+    sampler = EnvSampler(root, session, cache, interval_s=0.0)
+    sampler.resume()
+    session.requests[0].set_result("0.00&0.00")
+    root.run()
+    assert cache.latest() is None
+    session.requests[1].set_result("22.00&41.00")
+    root.run()
+    assert cache.latest()[:2] == (22.0, 41.0)
+
+
+def test_request_now_reuses_the_request_in_flight():
+    root, session = FakeRoot(), FakeSession()
+    sampler = EnvSampler(root, session, EnvCache(), interval_s=60.0)
+    sampler.resume()
+    assert sampler.request_now() is session.requests[0]
+    sampler.pause()
+    assert not root.jobs
+    session.requests[0].set_exception(RuntimeError("no answer"))
+    assert sampler.request_now() is session.requests[1]
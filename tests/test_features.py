@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from scipy.signal import savgol_filter
+
+from emulator import DeviceEmulator
+from features import FeatureEngine, savgol_batch
+
+
+@pytest.mark.parametrize("window_length, polyorder", [(31, 3), (11, 2), (5, 4)])
+def test_savgol_batch_matches_scipy(window_length, polyorder):
+    data = np.random.default_rng(0).normal(size=(4, 2, 6, 501))
+    np.testing.assert_allclose(savgol_batch(data, window_length, polyorder),
+                               savgol_filter(data, window_length, polyorder, axis=-1), atol=1e-10)
+
+
+def test_savgol_batch_short_rows_raise_like_scipy():
+    with pytest.raises(ValueError):
+        savgol_batch(np.zeros(10), 31, 3)
+
+
+@pytest.fixture(scope="module")
+def pair():
+    emulator = DeviceEmulator(banner=False, seed=0, peak_shift=6.0)
+    return emulator.sweep(False), emulator.sweep(True)
+
+
+def test_batch_equals_one_by_one(pair):
+    init, normal = pair
+    engine = FeatureEngine()
+    batch = engine.extract(np.stack([np.stack(pair)] * 3))
+    single = engine.extract_pair(init, normal)
+    for got, expected in zip(batch, single):
+        np.testing.assert_array_equal(got, np.broadcast_to(expected, got.shape))
+
+
+def test_phase_shift_of_a_shifted_peak(pair):
+    features = FeatureEngine().extract_pair(*pair)
+    assert features.phase_shift.shape == (3,)
+    assert np.all(np.abs(features.phase_shift - 6) <= 2)
+    assert features.quality == tuple(int(v) for v in features.phase_shift)
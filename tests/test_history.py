@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from history import MeasurementHistory
+
+
+def fill(history, count, start=0):
+    for i in range(start, start + count):
+        history.append(float(i), 20.0 + i, None, [i, i, i], [i + 1, i + 1, i + 1], timestamp=1000.0 + 60.0 * i)
+
+
+def test_view_is_oldest_first():
+    history = MeasurementHistory(capacity=8)
+    fill(history, 3)
+    view = history.view()
+    assert len(history) == 3
+    assert view.quality.tolist() == [0.0, 1.0, 2.0]
+    assert np.isnan(view.humidity).all()
+    assert view.peaks.shape == (3, 2, 3)
+    assert view.peaks[2].tolist() == [[2, 2, 2], [3, 3, 3]]
+
+
+def test_wrap_around_drops_the_oldest():
+    history = MeasurementHistory(capacity=4)
+    fill(history, 10)
+    assert len(history) == 4
+    assert history.view().quality.tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert history.view(last=2).timestamp.tolist() == [1000.0 + 60 * 8, 1000.0 + 60 * 9]
+    assert history.view(last=100).quality.size == 4
+
+
+def test_missing_temperature_is_nan():
+    history = MeasurementHistory()
+    history.append(1.0, None, None, [0, 0, 0], [0, 0, 0], timestamp=1.0)
+    assert np.isnan(history.view().temperature[0])
+
+
+def test_slope_in_score_per_hour():
+    history = MeasurementHistory(capacity=16)
+    assert history.slope() is None
+    fill(history, 2)
+    assert history.slope() is None  # needs 3 measurements
+    fill(history, 4, start=2)
+    assert history.slope() == pytest.approx(60.0)  # one unit per minute
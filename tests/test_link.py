@@ -0,0 +1,47 @@
+import pytest
+import serial
+
+import link
+from emulator import DeviceEmulator
+from sweep_reader import SweepReader
+
+
+@pytest.fixture
+def board(request, monkeypatch):
+    monkeypatch.setattr(link, "REVERT_TIMEOUT_S", 0.0)
+    emulator = DeviceEmulator(banner=False, seed=0, **getattr(request, "param", {}))
+    emulator.start()
+    ser = serial.Serial(emulator.port, link.BOOT_RATE, timeout=0.05)
+    reader = SweepReader(ser)
+    reader.start()
+    yield emulator, ser, reader
+    reader.stop()
+    ser.close()
+    emulator.stop()
+
+
+@pytest.mark.parametrize("board", [{"max_rate": 500000}], indirect=True)
+def test_fastest_rate_the_cable_carries(board):
+    emulator, ser, reader = board
+    assert link.negotiate_rate(ser, reader, rates=(1000000, 500000), timeout=0.3) == 500000
+    assert ser.baudrate == emulator.rate == 500000
+
+
+def test_firmware_without_rate_switching_keeps_the_boot_rate(board):
+    emulator, ser, reader = board
+    emulator.handle = emulator.commands.append
+    assert link.negotiate_rate(ser, reader, timeout=0.2) == link.BOOT_RATE
+    assert emulator.commands == ["baud 1000000"]
+
+
+def test_binary_sweep_is_flow_controlled(board):
+    emulator, ser, reader = board
+    emulator.ack_timeout = 0.2  # the emulator gives up if the acks stop
+    ser.write(b"start_bin\n")
+    kind, result = reader.events.get(timeout=5)
+    assert kind == "sweep" and result.data.shape == (6, 501)
+
+
+def test_throughput_probe(board):
+    _, ser, reader = board
+    assert link.measure_throughput(ser, reader, size=4000) > 0
@@ -0,0 +1,15 @@
+import os
+
+from reprocess import INIT_SUFFIX, NORMAL_SUFFIX, find_pairs
+
+
+def test_pairs_in_name_order(tmp_path):
+    for sub in ("b", "a", "a/c"):
+        directory = tmp_path / sub
+        directory.mkdir(parents=True, exist_ok=True)
+        for prefix in ("2_", "1_"):
+            (directory / (prefix + INIT_SUFFIX)).write_text("")
+            (directory / (prefix + NORMAL_SUFFIX)).write_text("")
+    (tmp_path / ("lonely_" + INIT_SUFFIX)).write_text("")
+    found = [os.path.relpath(init, tmp_path).replace(os.sep, "/") for init, _ in find_pairs(str(tmp_path))]
+    assert found == [f"{sub}/{prefix}{INIT_SUFFIX}" for sub in ("a", "a/c", "b") for prefix in ("1_", "2_")]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from sanitize import fill_invalid, parse_row, sanitize_row
+
+
+@pytest.mark.parametrize("line", [b"1.5,2.5,3.5,\r\n", "1.5,2.5,3.5", b"1.5,2.5,3.5"])
+def test_parse_row_bytes_or_str_with_or_without_trailing_comma(line):
+    values, valid = parse_row(line)
+    np.testing.assert_array_equal(values, [1.5, 2.5, 3.5])
+    assert valid.all()
+
+
+def test_invalid_tokens_are_flagged():
+    values, valid = parse_row(b"1,nan,ovf,inf,-inf,6,")
+    assert valid.tolist() == [True, False, False, False, False, True]
+    assert np.isnan(values[1:5]).all()
+
+
+def test_garbage_token_falls_back_per_token():
+    values, valid = parse_row(b"1,2,3.5x,4")
+    assert valid.tolist() == [True, True, False, True]
+    assert values[3] == 4.0
+
+
+def test_points_pads_and_cuts():
+    values, valid = parse_row(b"1,2", points=4)
+    assert valid.tolist() == [True, True, False, False]
+    values, _ = parse_row(b"1,2,3,4,5", points=3)
+    np.testing.assert_array_equal(values, [1, 2, 3])
+
+
+def test_empty_row():
+    values, valid = parse_row(b",\r\n", points=3)
+    assert values.shape == (3,) and not valid.any()
+
+
+def test_fill_invalid_interpolates_and_holds_the_edges():
+    values = np.array([np.nan, 1.0, np.nan, 3.0, np.nan])
+    fill_invalid(values, np.isfinite(values))
+    np.testing.assert_array_equal(values, [1.0, 1.0, 2.0, 3.0, 3.0])
+
+
+def test_fill_invalid_zeroes_rows_without_a_valid_point():
+    rows = np.array([[np.nan, np.nan], [1.0, np.nan]])
+    fill_invalid(rows, np.isfinite(rows))
+    np.testing.assert_array_equal(rows, [[0.0, 0.0], [1.0, 1.0]])
+
+
+def test_sanitize_row_keeps_the_mask():
+    values, valid = sanitize_row(b"0,ovf,4,")
+    np.testing.assert_array_equal(values, [0.0, 2.0, 4.0])
+    assert valid.tolist() == [True, False, True]
@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pytest
+
+from emulator import DeviceEmulator
+from features import FeatureEngine, parabolic_peak
+from scoring import START_FREQUENCIES, Calibration, ScoringEngine
+
+
+@pytest.fixture(scope="module")
+def pair():
+    emulator = DeviceEmulator(banner=False, seed=0, peak_shift=6.0)
+    return emulator.sweep(False), emulator.sweep(True)
+
+
+def test_parabolic_peak_recovers_sub_bin_vertex():
+    x = np.arange(50)
+    assert parabolic_peak(-(x - 20.3) ** 2) == pytest.approx(20.3)
+    assert parabolic_peak(x.astype(float)) == 49  # maximum on the last bin
+
+
+@pytest.mark.parametrize("method", ["peak", "xcorr"])
+def test_shift_is_found_in_hz(pair, method):
+    score = ScoringEngine(method=method).score_pair(*pair)
+    assert np.all(np.abs(score.shift_hz - 6.0) < 3.0)
+    assert score.score == pytest.approx(np.abs(score.shift_hz).mean())
+
+
+def test_frequency_axis_is_the_firmware_sweep(pair):
+    score = ScoringEngine().score_pair(*pair)
+    assert np.all(score.init_hz >= np.array(START_FREQUENCIES))
+    assert np.all(score.init_hz < np.array(START_FREQUENCIES) + 501)
+
+
+def test_score_features_match_feature_engine(pair):
+    score = ScoringEngine().score_pair(*pair)
+    np.testing.assert_array_equal(score.features.phase_shift, FeatureEngine().extract_pair(*pair).phase_shift)
+
+
+def test_unswept_channel_is_left_out(pair):
+    init, normal = pair
+    normal = normal.copy()
+    normal[2:4] = np.nan
+    score = ScoringEngine().score_pair(init, normal)
+    assert np.isnan(score.shift_hz[1])
+    assert score.score == pytest.approx(np.abs(score.shift_hz[[0, 2]]).mean())
+
+
+def test_calibration_table(tmp_path, pair):
+    path = tmp_path / "calibration.json"
+    path.write_text(json.dumps({"shift_hz": [0, 10], "score": [100, 0]}))
+    score = ScoringEngine(calibration=Calibration.load(path)).score_pair(*pair)
+    assert score.score == pytest.approx(100 - 10 * np.abs(score.shift_hz).mean())
+
+
+@pytest.mark.parametrize("table", [{"shift_hz": [0], "score": [0]}, {"shift_hz": [5, 0], "score": [0, 1]}])
+def test_bad_calibration_table(tmp_path, table):
+    path = tmp_path / "calibration.json"
+    path.write_text(json.dumps(table))
+    with pytest.raises(ValueError):
+        Calibration.load(path)
@@ -0,0 +1,133 @@
+import time
+
+import numpy as np
+import pytest
+import serial
+
+from emulator import DeviceEmulator
+from serial_session import SerialSession, SessionError
+from shift import xcorr_shift
+from sweep_reader import SweepReader
+
+
+@pytest.fixture
+def link(request):
+    emulator = DeviceEmulator(banner=False, seed=0, peak_shift=40.0, **getattr(request, "param", {}))
+    emulator.start()
+    ser = serial.Serial(emulator.port, 115200, timeout=0.05)
+    reader = SweepReader(ser)
+    reader.start()
+    session = SerialSession(ser, reader)
+    session.start()
+    yield emulator, session
+    session.close()
+    reader.stop()
+    ser.close()
+    emulator.stop()
+
+
+def drop_first_command(emulator):
+    handle = emulator.handle
+
+    def dropping(command):
+        if not emulator.commands:
+            emulator.commands.append(command)
+        else:
+            handle(command)
+    emulator.handle = dropping
+
+
+def is_normal_sweep(emulator, result):
+    """True if ``result`` is a "start" sweep: peaks 40 Hz above the init sweep."""
+    shift = xcorr_shift(emulator.sweep(False)[0::2], result.data[0::2]).shift
+    return bool(np.all(np.abs(shift - 40.0) < 10.0))
+
+
+def test_sweep_and_temp(link):
+    emulator, session = link
+    assert session.sweep(b"start_bin").result(timeout=10).data.shape == (6, 501)
+    assert "&" in session.temp().result(timeout=5)
+    assert emulator.commands == ["start_bin", "temp"]
+
+
+@pytest.mark.parametrize("suffix", [b"", b"_bin"])
+def test_dropped_sweep_does_not_block_later_sweeps(link, suffix):
+    emulator, session = link
+    drop_first_command(emulator)
+    with pytest.raises(SessionError, match="no answer"):
+        session.sweep(b"start" + suffix, timeout=0.5).result(timeout=5)
+    for _ in range(3):
+        assert session.sweep(b"start" + suffix, timeout=5).result(timeout=10).rows == 6
+
+
+def test_corrupt_frame_does_not_block_later_sweeps(link):
+    emulator, session = link
+    send_frame = emulator._send_frame
+
+    def corrupting(frame):
+        emulator._send_frame = send_frame
+        send_frame(frame[:-1] + bytes([frame[-1] ^ 0xFF]))
+    emulator._send_frame = corrupting
+    with pytest.raises(SessionError, match="corrupt"):
+        session.sweep(b"start_bin", timeout=5).result(timeout=10)
+    for _ in range(2):
+        assert session.sweep(b"start_bin", timeout=5).result(timeout=10).rows == 6
+
+
+def stall_after_first_row(emulator, seconds=None):
+    """The next ASCII answer stops after its first row, for ``seconds`` or (None) for good."""
+    write = emulator._write
+
+    def stalling(data):
+        write(data)
+        if data.endswith(b",\r\n"):
+            if seconds is None:
+                emulator._write = lambda data: None  # the board reset
+            else:
+                del emulator._write
+                time.sleep(seconds)
+    emulator._write = stalling
+
+
+def test_rest_of_a_cut_off_answer_is_dropped(link):
+    emulator, session = link
+    stall_after_first_row(emulator, 1.0)
+    init = session.sweep(b"init_start", timeout=5, idle_timeout=0.3)
+    normal = session.sweep(b"start", timeout=5)
+    with pytest.raises(SessionError, match="cut off"):
+        init.result(timeout=5)
+    result = normal.result(timeout=10)
+    assert result.rows == 6 and is_normal_sweep(emulator, result)
+
+
+def test_owed_answer_expires(link):
+    emulator, session = link
+    stall_after_first_row(emulator)
+    with pytest.raises(SessionError, match="cut off"):
+        session.sweep(b"init_start", timeout=0.5, idle_timeout=0.3).result(timeout=5)
+    del emulator._write
+    time.sleep(0.6)
+    assert session.sweep(b"start", timeout=5).result(timeout=10).rows == 6
+
+
+@pytest.mark.parametrize("link", [{"sweep_time": 1.0}], indirect=True)
+def test_slow_sweep_is_not_resent(link):
+    emulator, session = link
+    with pytest.raises(SessionError, match="1 attempts"):
+        session.sweep(b"start_bin", timeout=0.5).result(timeout=5)
+    time.sleep(1.0)
+    assert emulator.commands == ["start_bin"]
+
+
+def test_temp_is_retried(link):
+    emulator, session = link
+    drop_first_command(emulator)
+    assert "&" in session.temp(timeout=0.5).result(timeout=5)
+    assert emulator.commands == ["temp", "temp"]
+
+
+def test_command_fails_after_retries(link):
+    emulator, session = link
+    emulator.handle = emulator.commands.append
+    with pytest.raises(SessionError, match="no answer after 2 attempts"):
+        session.temp(timeout=0.3).result(timeout=5)
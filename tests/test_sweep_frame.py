@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from sweep_frame import (FRAME_CHUNK, FRAME_WINDOW, HEADER_SIZE, KIND_REAL_IMAG_I16, decode_frame,
+                         encode_frame, frame_acks, frame_size, phase_magnitude)
+
+
+def sweep_data(channels=3, points=501, seed=0):
+    return np.random.default_rng(seed).normal(100.0, 5.0, (channels, 2, points)).astype(np.float32)
+
+
+def test_round_trip():
+    data = sweep_data()
+    frame = decode_frame(encode_frame(data, channel_mask=0b101, temperature=21.5, humidity=45.0))
+    np.testing.assert_array_equal(frame.data, data)
+    assert frame.channel_mask == 0b101
+    assert frame.temperature == pytest.approx(21.5)
+    assert frame.humidity == pytest.approx(45.0)
+
+
+def test_default_mask_covers_every_channel():
+    assert decode_frame(encode_frame(sweep_data(channels=5))).channel_mask == 0b11111
+
+
+def test_frame_size_from_header():
+    raw = encode_frame(sweep_data())
+    assert frame_size(raw[:HEADER_SIZE]) == len(raw)
+
+
+def test_real_imag_frame_converts_to_phase_magnitude():
+    raw = np.array([[[3, 0], [4, 1]]], dtype=np.int16)  # one channel, two points
+    result = phase_magnitude(decode_frame(encode_frame(raw, kind=KIND_REAL_IMAG_I16)))
+    np.testing.assert_allclose(result[0, 0], np.degrees(np.arctan2([4, 1], [3, 0])))
+    np.testing.assert_allclose(result[0, 1], [5.0, 1.0])
+
+
+def test_crc_mismatch():
+    raw = bytearray(encode_frame(sweep_data()))
+    raw[HEADER_SIZE + 10] ^= 0xFF
+    with pytest.raises(ValueError, match="CRC"):
+        decode_frame(bytes(raw))
+
+
+def test_truncated_frame():
+    raw = encode_frame(sweep_data())
+    with pytest.raises(ValueError, match="truncated"):
+        decode_frame(raw[:-1])
+
+
+@pytest.mark.parametrize("offset, value, message", [(0, 0x00, "magic"), (2, 99, "version"), (3, 7, "kind")])
+def test_bad_header(offset, value, message):
+    raw = bytearray(encode_frame(sweep_data()))
+    raw[offset] = value
+    with pytest.raises(ValueError, match=message):
+        frame_size(bytes(raw))
+
+
+def test_frame_acks_leave_no_stray_credit():
+    size = 10 * FRAME_CHUNK + 17  # 11 chunks
+    assert frame_acks(size, 0) == 0
+    assert frame_acks(size, FRAME_CHUNK - 1) == 0
+    assert frame_acks(size, FRAME_CHUNK) == 1
+    assert frame_acks(size, 3 * FRAME_CHUNK + 5) == 3
+    # the last FRAME_WINDOW chunks are covered by the initial credits
+    assert frame_acks(size, size) == 11 - FRAME_WINDOW
+
+
+def test_small_frame_needs_no_acks():
+    assert frame_acks(FRAME_WINDOW * FRAME_CHUNK, FRAME_WINDOW * FRAME_CHUNK) == 0
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from sweep_frame import encode_frame
+from sweep_model import Sweep, concat
+from sweep_reader import SweepParser
+
+FREQUENCIES = (16900, 17235, 17330)
+
+
+def frame_result(channel_mask, temperature=21.0, humidity=40.0):
+    data = np.ones((3, 2, 501), dtype=np.float32)
+    (event,) = SweepParser().feed(encode_frame(data, channel_mask=channel_mask,
+                                               temperature=temperature, humidity=humidity))
+    return event[1]
+
+
+def test_rows_view_is_interleaved():
+    data = np.arange(3 * 2 * 4, dtype=np.float32).reshape(3, 2, 4)
+    sweep = Sweep(data, FREQUENCIES)
+    np.testing.assert_array_equal(sweep.rows[2], data[1, 0])
+    np.testing.assert_array_equal(sweep.rows[3], sweep.magnitude[1])
+    np.testing.assert_array_equal(sweep.frequencies()[1, :2], [17235, 17236])
+
+
+def test_shape_checks():
+    with pytest.raises(ValueError):
+        Sweep(np.zeros((3, 3, 4)), FREQUENCIES)
+    with pytest.raises(ValueError):
+        Sweep(np.zeros((2, 2, 4)), FREQUENCIES)
+
+
+def test_from_result_blanks_unswept_channels():
+    sweep = Sweep.from_result(frame_result(0b011), FREQUENCIES, device="a")
+    assert sweep.swept().tolist() == [True, True, False]
+    assert np.isnan(sweep.data[2]).all() and not sweep.valid[2].any()
+    assert not np.isnan(sweep.data[:2]).any()
+    assert (sweep.temperature, sweep.humidity, sweep.devices) == (21.0, 40.0, ("a",) * 3)
+
+
+def test_from_result_without_environment_reading():
+    sweep = Sweep.from_result(frame_result(0b111, 0.0, 0.0), FREQUENCIES)
+    assert sweep.temperature is None and sweep.humidity is None
+
+
+def test_concat_joins_channels_and_masks():
+    a = Sweep(np.zeros((3, 2, 4)), FREQUENCIES, channel_mask=0b101, temperature=20.0, timestamp=5.0, device="a")
+    b = Sweep(np.ones((2, 2, 4)), (18000, 18100), channel_mask=0b10, timestamp=3.0, device="b")
+    combined = concat([a, b])
+    assert combined.channels == 5
+    assert combined.swept().tolist() == [True, False, True, False, True]
+    assert combined.devices == ("a", "a", "a", "b", "b")
+    assert combined.start_frequencies.tolist() == [16900, 17235, 17330, 18000, 18100]
+    assert (combined.temperature, combined.timestamp) == (20.0, 3.0)
+    np.testing.assert_array_equal(combined.data[3:], 1.0)
+
+
+def test_concat_needs_the_same_axis():
+    a = Sweep(np.zeros((1, 2, 4)), (16900,))
+    with pytest.raises(ValueError):
+        concat([a, Sweep(np.zeros((1, 2, 5)), (16900,))])
+    with pytest.raises(ValueError):
+        concat([a, Sweep(np.zeros((1, 2, 4)), (16900,), step=2.0)])
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from sweep_frame import FRAME_CHUNK, encode_frame, frame_acks
+from sweep_reader import SweepParser
+
+POINTS = 20
+
+
+def ascii_payload(data, env=b"21.50&45.00"):
+    lines = [",".join(f"{v:.2f}" for v in row) + ",\r\n" for row in data]
+    return "".join(lines).encode() + env + b"\r\n"
+
+
+def feed(parser, payload, chunk):
+    events = []
+    for i in range(0, len(payload), chunk):
+        events += parser.feed(payload[i:i + chunk])
+    return events
+
+
+def kinds(events, kind):
+    return [payload for k, payload in events if k == kind]
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 64, 100000])
+def test_ascii_sweep_in_any_chunking(chunk):
+    data = np.round(np.random.default_rng(1).normal(10, 1, (6, POINTS)), 2)
+    events = feed(SweepParser(points=POINTS), ascii_payload(data), chunk)
+    (sweep,) = kinds(events, "sweep")
+    np.testing.assert_allclose(sweep.data, data)
+    assert sweep.rows == 6
+    assert sweep.env_line == "21.50&45.00"
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 64])
+def test_partial_rows_add_up_to_the_sweep(chunk):
+    data = np.round(np.random.default_rng(2).normal(10, 1, (6, POINTS)), 2)
+    events = feed(SweepParser(points=POINTS), ascii_payload(data), chunk)
+    seen = np.full((6, POINTS), np.nan)
+    for row, start, values in kinds(events, "partial"):
+        seen[row, start:start + values.size] = values
+    np.testing.assert_allclose(seen, data)
+
+
+def test_ovf_values_are_interpolated_and_flagged():
+    data = np.tile(np.arange(POINTS, dtype=float), (6, 1))
+    payload = ascii_payload(data).replace(b",5.00,", b",ovf,", 1)
+    (sweep,) = kinds(SweepParser(points=POINTS).feed(payload), "sweep")
+    assert not sweep.valid[0, 5] and sweep.valid[0, 4]
+    assert sweep.data[0, 5] == pytest.approx(5.0)
+
+def test_back_to_back_sweeps():
+    data = np.ones((6, POINTS))
+    events = SweepParser(points=POINTS).feed(ascii_payload(data) * 2)
+    assert len(kinds(events, "sweep")) == 2
+
+
+def test_env_and_text_lines():
+    events = SweepParser(points=POINTS).feed(b"starting\r\n21.00&40.00\r\n")
+    assert events == [("text", "starting"), ("env", "21.00&40.00")]
+
+
+@pytest.mark.parametrize("chunk", [1, 33, 256, 100000])
+def test_binary_frame_in_any_chunking(chunk):
+    data = np.random.default_rng(3).normal(0, 1, (3, 2, 501)).astype(np.float32)
+    events = feed(SweepParser(), encode_frame(data, temperature=20.0, humidity=50.0), chunk)
+    (sweep,) = kinds(events, "sweep")
+    np.testing.assert_array_equal(sweep.data, data.reshape(6, 501))
+    assert sweep.env_line == "20.00&50.00"
+
+
+def test_corrupt_frame_reports_error_and_recovers():
+    bad = bytearray(encode_frame(np.zeros((3, 2, 501), dtype=np.float32)))
+    bad[-1] ^= 0xFF
+    parser = SweepParser()
+    events = parser.feed(bytes(bad)) + parser.feed(b"21.00&40.00\r\n")
+    assert [k for k, _ in events if k != "ack"] == ["error", "env"]
+
+
+@pytest.mark.parametrize("chunk", [1, 33, FRAME_CHUNK])
+def test_frame_acks_match_the_chunks_received(chunk):
+    raw = encode_frame(np.zeros((3, 2, 501), dtype=np.float32))
+    events = feed(SweepParser(), raw, chunk)
+    assert sum(kinds(events, "ack")) == frame_acks(len(raw), len(raw))
+
+
+def test_frame_received_at_once_needs_no_acks():
+    raw = encode_frame(np.zeros((3, 2, 501), dtype=np.float32))
+    assert [k for k, _ in SweepParser().feed(raw)] == ["sweep"]
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from timing import SpanRecorder
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_percentiles_per_stage():
+    recorder = SpanRecorder()
+    for ms in range(1, 101):
+        recorder.record("parse", ms / 1e3)
+    recorder.record("plot", 0.5)
+    stats = recorder.percentiles((50, 95))
+    n, worst, p50, p95 = stats["parse"]
+    assert (n, worst) == (100, pytest.approx(100.0))
+    assert p50 == pytest.approx(50.5) and p95 == pytest.approx(95.05)
+    assert stats["plot"][:2] == (1, pytest.approx(500.0))
+
+
+def test_ring_buffer_keeps_the_latest_spans():
+    recorder = SpanRecorder(capacity=4)
+    for i in range(10):
+        recorder.record("old" if i < 6 else "new", i / 1e3)
+    stats = recorder.percentiles()
+    assert "old" not in stats
+    assert stats["new"][:2] == (4, pytest.approx(9.0))
+
+
+def test_flush_writes_each_span_once(tmp_path):
+    path = tmp_path / "timing.jsonl"
+    recorder = SpanRecorder()
+    recorder.record("a", 0.001, wall=100.0)
+    recorder.flush(path)
+    recorder.flush(path)  # nothing new
+    recorder.record("b", 0.002, wall=101.0)
+    recorder.flush(path)
+    assert read_lines(path) == [{"stage": "a", "time": 100.0, "ms": 1.0},
+                                {"stage": "b", "time": 101.0, "ms": 2.0}]
+
+
+def test_flush_after_wrap_around_skips_overwritten_spans(tmp_path):
+    path = tmp_path / "timing.jsonl"
+    recorder = SpanRecorder(capacity=3)
+    for i in range(5):
+        recorder.record("s", 0.001, wall=float(i))
+    recorder.flush(path)
+    assert [line["time"] for line in read_lines(path)] == [2.0, 3.0, 4.0]
+
+
+def test_span_context_records_even_on_error():
+    recorder = SpanRecorder()
+    with pytest.raises(RuntimeError):
+        with recorder.span("failing"):
+            raise RuntimeError
+    assert recorder.percentiles()["failing"][0] == 1
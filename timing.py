@@ -0,0 +1,82 @@
+"""Lightweight timing spans for the measurement hot paths.
+
+Spans go into a fixed-size ring buffer (preallocated arrays, no allocation
+per span), so instrumentation can stay on in the field. The diagnostics
+screen reads per-stage percentiles from it, and ``flush`` appends the spans
+recorded since the last flush to a JSON-lines file.
+
+    with span("features"):
+        features = feature_engine.extract_pair(init, normal)
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class SpanRecorder:
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._stage = np.zeros(capacity, dtype=np.int16)
+        self._wall = np.zeros(capacity)        # time.time() at span start
+        self._duration = np.zeros(capacity)    # seconds
+        self._names = []
+        self._ids = {}
+        self._count = 0                        # spans ever recorded
+        self._flushed = 0
+        self._lock = threading.Lock()
+
+    def record(self, name, duration, wall=None):
+        with self._lock:
+            stage = self._ids.get(name)
+            if stage is None:
+                stage = self._ids[name] = len(self._names)
+                self._names.append(name)
+            i = self._count % self.capacity
+            self._stage[i] = stage
+            self._wall[i] = time.time() - duration if wall is None else wall
+            self._duration[i] = duration
+            self._count += 1
+
+    @contextmanager
+    def span(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0)
+
+    def _snapshot(self, since=0):
+        """(stage ids, wall times, durations) of the buffered spans numbered >= since, oldest first."""
+        with self._lock:
+            start = max(since, self._count - self.capacity)
+            idx = np.arange(start, self._count) % self.capacity
+            return self._stage[idx], self._wall[idx], self._duration[idx], list(self._names), self._count
+
+    def percentiles(self, q=(50, 95)):
+        """{stage: (count, max, *percentiles)} in milliseconds over the buffered spans."""
+        stage, _, duration, names, _ = self._snapshot()
+        stats = {}
+        for sid, name in enumerate(names):
+            d = duration[stage == sid] * 1e3
+            if d.size:
+                stats[name] = (d.size, float(d.max()), *np.percentile(d, q).tolist())
+        return stats
+
+    def flush(self, path):
+        """Append the spans recorded since the last flush to ``path`` as JSON lines."""
+        stage, wall, duration, names, count = self._snapshot(self._flushed)
+        self._flushed = count
+        if not stage.size:
+            return
+        with open(path, "a") as f:
+            for sid, t, d in zip(stage, wall, duration):
+                f.write(json.dumps({"stage": names[sid], "time": round(float(t), 6),
+                                    "ms": round(float(d) * 1e3, 3)}) + "\n")
+
+
+recorder = SpanRecorder()
+span = recorder.span
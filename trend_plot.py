@@ -0,0 +1,68 @@
+"""Quality-over-time plot on a Tk canvas for the trend screen.
+
+Like LivePlot, the canvas items (axes, the quality line, the temperature
+line and the labels) are created once and ``update`` only moves their
+coordinates. Quality and temperature are scaled independently; the time
+axis spans the first to the last measurement shown.
+"""
+
+import time
+
+import numpy as np
+
+QUALITY_COLOR = "#1f77b4"
+TEMPERATURE_COLOR = "#d62728"
+
+
+class TrendPlot:
+    def __init__(self, canvas, x, y, width, height, font=None):
+        self.canvas = canvas
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        canvas.create_rectangle(x, y, x + width, y + height, outline="#c0c0c0")
+        self._quality = canvas.create_line(0, 0, 0, 0, fill=QUALITY_COLOR, width=2, state="hidden")
+        self._temperature = canvas.create_line(0, 0, 0, 0, fill=TEMPERATURE_COLOR, width=1, state="hidden")
+        self._top = canvas.create_text(x + 2, y + 2, anchor="nw", fill=QUALITY_COLOR, font=font)
+        self._bottom = canvas.create_text(x + 2, y + height - 2, anchor="sw", fill=QUALITY_COLOR, font=font)
+        self._span = canvas.create_text(x + width - 2, y + height - 2, anchor="se", font=font)
+
+    def _coords(self, xs, values):
+        """(coords, min, max) of the finite ``values`` scaled to the plot height; coords is None below 2 points."""
+        finite = np.isfinite(values)
+        if finite.sum() < 2:
+            return None, 0.0, 0.0
+        v = values[finite].astype(np.float64)
+        vmin, vmax = v.min(), v.max()
+        scale = (self.height - 8) / (vmax - vmin) if vmax > vmin else 0.0
+        ys = self.y + self.height - 4 - (v - vmin) * scale
+        if scale == 0.0:
+            ys[:] = self.y + self.height / 2
+        return np.column_stack([xs[finite], ys]).ravel().tolist(), vmin, vmax
+
+    def update(self, view):
+        """Draw a history.HistoryView."""
+        t = view.timestamp
+        duration = float(t[-1] - t[0]) if t.size else 0.0
+        if t.size > 1 and duration > 0:
+            xs = self.x + 2 + (t - t[0]) * ((self.width - 4) / duration)
+        else:
+            xs = self.x + 2 + np.arange(t.size) * ((self.width - 4) / max(1, t.size - 1))
+
+        for item, values in ((self._quality, view.quality), (self._temperature, view.temperature)):
+            coords, vmin, vmax = self._coords(xs, values)
+            if coords is None:
+                self.canvas.itemconfigure(item, state="hidden")
+            else:
+                self.canvas.coords(item, coords)
+                self.canvas.itemconfigure(item, state="normal")
+            if item == self._quality:
+                self.canvas.itemconfigure(self._top, text="" if coords is None else f"{vmax:.1f}")
+                self.canvas.itemconfigure(self._bottom, text="" if coords is None else f"{vmin:.1f}")
+
+        if t.size:
+            since = time.strftime("%H:%M", time.localtime(t[0]))
+            self.canvas.itemconfigure(self._span, text=f"since {since}, {duration / 60:.0f} min")
+        else:
+            self.canvas.itemconfigure(self._span, text="")